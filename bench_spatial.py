@@ -0,0 +1,96 @@
+"""
+Đo thời gian một tick mô phỏng theo số quái: lưới không gian (spatial_hash) so với
+duyệt toàn bộ danh sách quái cho mỗi truy vấn tầm bắn.
+
+Chạy: python bench_spatial.py
+"""
+import random
+import time
+
+import constants
+
+constants.init_runtime(headless=True)
+
+from constants import *
+from enemy import BasicEnemy
+from simulation import Simulation
+from spatial_hash import SpatialHash
+
+ENEMY_COUNTS = (50, 200, 800, 2000)
+NUM_TOWERS = 40
+TICKS = 30
+# Máu thấp để mục tiêu chết thường xuyên và tháp phải chọn lại như trong game thật
+ENEMY_HEALTH = 60
+TOWER_TYPES = ("basic_tower", "rapid_tower", "sniper_tower", "laser_tower", "slow_tower")
+
+
+class LinearScan(SpatialHash):
+    """Same API as SpatialHash but every query walks all enemies (the old behaviour)."""
+
+    def __init__(self):
+        super().__init__()
+        self.entities = []
+
+    def insert(self, entity):
+        self.entities.append(entity)
+        self.entity_cells[id(entity)] = None
+        self.order[id(entity)] = next(self._counter)
+
+    def remove(self, entity):
+        self.entities.remove(entity)
+        del self.entity_cells[id(entity)]
+        del self.order[id(entity)]
+
+    def update(self, entity):
+        pass
+
+    def _cells_around(self, x, y, radius):
+        return [self.entities]
+
+
+def build_simulation(num_enemies: int, grid: SpatialHash) -> Simulation:
+    random.seed(1)
+    sim = Simulation("Forest", "Medium")
+    sim.gold = 10 ** 9
+    sim.lives = 10 ** 9
+    sim.enemy_grid = grid
+
+    # Tháp đặt sát đường đi để luôn có mục tiêu
+    placed = 0
+    for grid_x, grid_y in sim.current_path:
+        for nx, ny in ((grid_x + 1, grid_y), (grid_x, grid_y + 1)):
+            if placed < NUM_TOWERS and sim.place_unit(TOWER_TYPES[placed % len(TOWER_TYPES)], nx, ny):
+                placed += 1
+
+    # Quái rải ngẫu nhiên dọc đường
+    path = sim.current_path
+    for _ in range(num_enemies):
+        enemy = BasicEnemy(path, sim)
+        enemy.path_index = random.randrange(len(path) - 2)
+        grid_x, grid_y = path[enemy.path_index]
+        enemy.x = enemy.prev_x = grid_x * GRID_SIZE + random.uniform(0, GRID_SIZE)
+        enemy.y = enemy.prev_y = grid_y * GRID_SIZE + random.uniform(0, GRID_SIZE)
+        enemy.health = enemy.max_health = ENEMY_HEALTH
+        sim.enemies.append(enemy)
+        sim.enemy_grid.insert(enemy)
+    return sim
+
+
+def time_ticks(num_enemies: int, grid: SpatialHash) -> float:
+    sim = build_simulation(num_enemies, grid)
+    start = time.perf_counter()
+    sim.step(TICKS)
+    return (time.perf_counter() - start) * 1000 / TICKS
+
+
+def main():
+    print(f"{NUM_TOWERS} towers, GRID_SIZE {GRID_SIZE}, ms per tick (average of {TICKS} ticks)")
+    print(f"{'enemies':>8} {'linear':>10} {'grid':>10} {'speedup':>8}")
+    for num_enemies in ENEMY_COUNTS:
+        linear = time_ticks(num_enemies, LinearScan())
+        grid = time_ticks(num_enemies, SpatialHash())
+        print(f"{num_enemies:>8} {linear:>10.2f} {grid:>10.2f} {linear / grid:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
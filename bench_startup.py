@@ -0,0 +1,60 @@
+"""
+So sánh thời gian nạp asset lúc khởi động: decode + scale PNG (cold) với đọc bản
+đã xử lý sẵn từ .asset_cache (warm).
+
+Chạy: python bench_startup.py
+"""
+import shutil
+import time
+
+import pygame
+import constants
+
+constants.init_runtime(headless=True)
+
+from constants import *
+import sprite_cache
+from enemy import BasicEnemy, FastEnemy, TankEnemy, Boss
+from explosion import load_explosion_frames
+from maps import MAPS, get_map_image_path
+from soldier import SOLDIER_IMAGE, soldier_image_size
+from tower import preload_tower_assets
+
+
+def load_all_assets():
+    path = [(0, 0), (1, 0)]
+    for enemy_class in (BasicEnemy, FastEnemy, TankEnemy, Boss):
+        enemy_class(path)
+    preload_tower_assets()
+    load_explosion_frames()
+    sprite_cache.load_scaled_image(SOLDIER_IMAGE, soldier_image_size())
+    for map_name in MAPS:
+        sprite_cache.load_scaled_image(get_map_image_path(map_name), (SCREEN_WIDTH - PANEL_WIDTH, SCREEN_HEIGHT),
+                                       keep_source=False)
+
+
+def timed_load() -> float:
+    sprite_cache.invalidate()
+    start = time.perf_counter()
+    load_all_assets()
+    return time.perf_counter() - start
+
+
+def main():
+    shutil.rmtree(sprite_cache.DISK_CACHE_DIR, ignore_errors=True)
+
+    sprite_cache.DISK_CACHE_ENABLED = False
+    no_cache = timed_load()
+    sprite_cache.DISK_CACHE_ENABLED = True
+    cold = timed_load()  # decode, scale và ghi cache
+    warm = timed_load()  # chỉ đọc cache
+
+    print(f"Screen {SCREEN_WIDTH}x{SCREEN_HEIGHT}, GRID_SIZE {GRID_SIZE}")
+    print(f"decode + scale PNG:      {no_cache * 1000:8.1f} ms")
+    print(f"first run (fill cache):  {cold * 1000:8.1f} ms")
+    print(f"preprocessed cache:      {warm * 1000:8.1f} ms  ({no_cache / warm:.1f}x faster)")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
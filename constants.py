@@ -1,19 +1,51 @@
+import os
+import sys
 import pygame
+from typing import Optional
 
-# Initialize Pygame
-pygame.init()
-pygame.font.init()
+# Kích thước mặc định, dùng khi chưa gọi init_runtime()
+DEFAULT_SCREEN_SIZE = (1280, 720)
 
-# Get display info for dynamic sizing
-display_info = pygame.display.Info()
-SCREEN_WIDTH = display_info.current_w
-SCREEN_HEIGHT = display_info.current_h
-GRID_SIZE = min(SCREEN_WIDTH // 20, SCREEN_HEIGHT // 15)  # Dynamic grid size based on screen dimensions
-GAME_FONT = pygame.font.SysFont('Arial', int(SCREEN_HEIGHT * 0.03))  # Dynamic font size
-TITLE_FONT = pygame.font.SysFont('Arial', int(SCREEN_HEIGHT * 0.05))  # Dynamic font size
-INFO_FONT = pygame.font.SysFont('Arial', int(SCREEN_HEIGHT * 0.022))  # Font nhỏ cho stats
 
-FPS = 60
+def grid_size_for(screen_width: int, screen_height: int) -> int:
+    """Grid size that fits a 20x15 tile board on the given screen."""
+    return min(screen_width // 20, screen_height // 15)
+
+
+# Tuỳ chọn vẽ ở độ phân giải logic cố định rồi để SDL phóng to một lần lên cửa sổ (pygame.SCALED),
+# để sprite, cache xoay và chi phí blit không tăng theo màn hình (vd. 4K).
+# Ô 48 px (bảng 20x15 = 960x720) vì panel bên phải và các nút menu có kích thước pixel cố định cần cao 720.
+LOGICAL_RESOLUTION_ENABLED = False
+LOGICAL_TILE_SIZE = 48
+LOGICAL_ROWS = 15
+# Độ rộng panel bên phải (px); bảng chơi chiếm SCREEN_WIDTH - PANEL_WIDTH
+PANEL_WIDTH = 200
+
+
+def logical_size_for(window_width: int, window_height: int):
+    """Fixed-height logical render size that keeps the window's aspect ratio."""
+    height = LOGICAL_TILE_SIZE * LOGICAL_ROWS
+    width = max(LOGICAL_TILE_SIZE * 20 + PANEL_WIDTH, round(height * window_width / window_height))
+    return width, height
+
+
+# Các giá trị phụ thuộc màn hình; init_runtime() ghi đè chúng.
+# Module khác dùng "from constants import *" nên phải import SAU khi init_runtime() chạy;
+# init_runtime() báo lỗi nếu đã có module chép bản cũ của các giá trị này.
+SCREEN_WIDTH, SCREEN_HEIGHT = DEFAULT_SCREEN_SIZE
+GRID_SIZE = grid_size_for(SCREEN_WIDTH, SCREEN_HEIGHT)
+GAME_FONT = None
+TITLE_FONT = None
+INFO_FONT = None
+# Cờ cho pygame.display.set_mode (pygame.SCALED khi dùng độ phân giải logic)
+DISPLAY_FLAGS = 0
+
+# Tốc độ mô phỏng cố định (tick/giây); mọi cooldown, tốc độ đều tính theo tick
+TICK_RATE = 60
+# Giới hạn tốc độ vẽ; vị trí được nội suy giữa hai tick nên màn hình 144 Hz vẫn mượt
+FPS = 144
+# Frame quá chậm thì chạy tối đa bấy nhiêu tick rồi bỏ phần dư
+MAX_TICKS_PER_FRAME = 5
 
 # Colors
 WHITE = (255, 255, 255)
@@ -45,3 +77,56 @@ PATH_2 = [(0, 7), (1, 7), (2, 7), (3, 7), (4, 7),
           (12, 4), (13, 4), (14, 4), (15, 4), 
           (15, 5), (15, 6), (15, 7), (15, 8),
           (16, 8), (17, 8), (18, 8), (19, 8)]
+
+
+def _star_importers():
+    """Names of the loaded modules that already did "from constants import *"."""
+    this = sys.modules[__name__]
+    return sorted(name for name, module in list(sys.modules.items())
+                  if module is not this and getattr(module, "init_runtime", None) is init_runtime)
+
+
+def init_runtime(screen_size=None, headless: bool = False, logical_resolution: Optional[bool] = None):
+    """
+    Initialise pygame and the screen-dependent constants.
+    screen_size=None dùng độ phân giải màn hình hiện tại.
+    headless=True dùng SDL dummy driver, không font, không mixer (cho test và benchmark).
+    logical_resolution=None dùng LOGICAL_RESOLUTION_ENABLED; khi bật, SCREEN_WIDTH/HEIGHT là kích thước logic.
+    """
+    global SCREEN_WIDTH, SCREEN_HEIGHT, GRID_SIZE, GAME_FONT, TITLE_FONT, INFO_FONT, DISPLAY_FLAGS
+
+    stale = _star_importers()
+    if stale:
+        raise RuntimeError("init_runtime() must run before importing " + ", ".join(stale) +
+                           ": they already copied the screen constants with 'from constants import *'")
+
+    if logical_resolution is None:
+        logical_resolution = LOGICAL_RESOLUTION_ENABLED
+    DISPLAY_FLAGS = 0
+    if headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+        pygame.display.init()
+        SCREEN_WIDTH, SCREEN_HEIGHT = screen_size or DEFAULT_SCREEN_SIZE
+        if logical_resolution:
+            # Dummy driver không có renderer để phóng to, chỉ dùng kích thước logic
+            SCREEN_WIDTH, SCREEN_HEIGHT = logical_size_for(SCREEN_WIDTH, SCREEN_HEIGHT)
+        GAME_FONT = TITLE_FONT = INFO_FONT = None
+        # Surface giả để convert_alpha() dùng được
+        pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    else:
+        pygame.init()
+        pygame.font.init()
+        if screen_size is None:
+            # Get display info for dynamic sizing
+            display_info = pygame.display.Info()
+            screen_size = (display_info.current_w, display_info.current_h)
+        SCREEN_WIDTH, SCREEN_HEIGHT = screen_size
+        if logical_resolution:
+            SCREEN_WIDTH, SCREEN_HEIGHT = logical_size_for(*screen_size)
+            DISPLAY_FLAGS = pygame.SCALED
+        GAME_FONT = pygame.font.SysFont('Arial', int(SCREEN_HEIGHT * 0.03))  # Dynamic font size
+        TITLE_FONT = pygame.font.SysFont('Arial', int(SCREEN_HEIGHT * 0.05))  # Dynamic font size
+        INFO_FONT = pygame.font.SysFont('Arial', int(SCREEN_HEIGHT * 0.022))  # Font nhỏ cho stats
+
+    GRID_SIZE = grid_size_for(SCREEN_WIDTH, SCREEN_HEIGHT)  # Dynamic grid size based on screen dimensions
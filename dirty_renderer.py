@@ -0,0 +1,59 @@
+import pygame
+from typing import List, Optional
+from constants import *
+
+# Nếu phần màn hình bẩn vượt tỉ lệ này thì flip cả màn hình cho rẻ hơn
+FULL_FLIP_RATIO = 0.4
+# Quá nhiều rect nhỏ cũng chậm hơn một lần flip
+MAX_DIRTY_RECTS = 400
+
+
+class DirtyRectRenderer:
+    """
+    Tracks which parts of the screen changed between frames.
+    Mỗi frame: restore() vẽ lại lớp nền tĩnh dưới các rect của frame trước,
+    sau đó vẽ entity, rồi present() chỉ đẩy các rect cũ + mới lên màn hình.
+    """
+
+    def __init__(self, full_flip_ratio: float = FULL_FLIP_RATIO, max_rects: int = MAX_DIRTY_RECTS):
+        self.full_flip_ratio = full_flip_ratio
+        self.max_rects = max_rects
+        self.previous_rects: List[pygame.Rect] = []
+        self.needs_full_redraw = True
+        self.screen_rect = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+
+    def invalidate(self):
+        """Force the next frame to redraw and present the whole screen."""
+        self.needs_full_redraw = True
+
+    def restore(self, screen: pygame.Surface, static_layer: pygame.Surface):
+        """Paint the static layer back under last frame's rects (or everywhere after invalidate())."""
+        if self.needs_full_redraw:
+            screen.blit(static_layer, (0, 0))
+        else:
+            for rect in self.previous_rects:
+                screen.blit(static_layer, rect, rect)
+
+    def present(self, rects: List[pygame.Rect], full: bool = False):
+        """Push this frame's rects plus last frame's to the display, or flip when too much changed."""
+        current = [rect.clip(self.screen_rect) for rect in rects]
+        current = [rect for rect in current if rect.width > 0 and rect.height > 0]
+        dirty = self.previous_rects + current
+
+        dirty_area = sum(rect.width * rect.height for rect in dirty)
+        screen_area = self.screen_rect.width * self.screen_rect.height
+        if (full or self.needs_full_redraw or len(dirty) > self.max_rects
+                or dirty_area > screen_area * self.full_flip_ratio):
+            pygame.display.flip()
+        elif dirty:
+            pygame.display.update(dirty)
+
+        self.previous_rects = current
+        # Sau khi flip toàn màn hình, frame sau vẫn cần toàn bộ nếu vừa có overlay phủ kín
+        self.needs_full_redraw = full
+
+
+def centered_rect(x: float, y: float, half: int, rect: Optional[pygame.Rect] = None) -> pygame.Rect:
+    """Square of side 2 * half centred on (x, y), optionally merged with rect."""
+    square = pygame.Rect(int(x) - half, int(y) - half, half * 2, half * 2)
+    return square.union(rect) if rect is not None else square
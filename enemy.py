@@ -1,74 +1,99 @@
 import math
+import numpy as np
 import pygame
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from constants import *
+import sprite_cache
+from dirty_renderer import centered_rect
+import health_bars
+import lod
+from render_queue import RenderQueue, LAYER_ENEMIES
+from enemy_store import EnemyStore, StoreField, ENEMY_TYPE_IDS
+
+# Sprite sheet của từng loại enemy: (path, frame_width, frame_height, row, num_cols, scale_width)
+ENEMY_SPRITE_SHEETS = {
+    "basic": ("assets/enemy/Magma Crab.png", 64, 64, 4, 8, 64),
+    "fast": ("assets/enemy/Leafbug.png", 64, 64, 4, 8, 64),
+    "tank": ("assets/enemy/Firebug.png", 128, 64, 4, 8, 128),
+    "boss": ("assets/enemy/Scorpion.png", 64, 64, 4, 8, 64),
+}
 
 class Enemy:
+    """
+    Proxy over one slot of an EnemyStore: vị trí, tốc độ, máu, path_index, slow... nằm trong mảng
+    NumPy của store, các thuộc tính còn lại (reward, damage, animation) là thuộc tính thường.
+    """
+    # Key trong ENEMY_SPRITE_SHEETS; None = vẽ bằng hình tròn
+    sprite_type: Optional[str] = None
+
+    x = StoreField()
+    y = StoreField()
+    # Vị trí ở tick trước, dùng để nội suy khi vẽ
+    prev_x = StoreField()
+    prev_y = StoreField()
+    speed = StoreField()
+    original_speed = StoreField()
+    health = StoreField()
+    # Quãng đường đã đi dọc path, tính theo ô (tâm ô i ứng với progress i); xem path_index.py
+    progress = StoreField()
+    angle = StoreField()
+    path_index = StoreField()
+    slow_timer = StoreField()
+    attack_cooldown = StoreField()
+    type_id = StoreField()
+    reached_end = StoreField()
+
     def __init__(self, path: List[Tuple[int, int]], speed: float, health: int, reward: int, game=None):
         self.path = path
-        self.path_index = 0
+        # Quái trong game dùng chung store của game; quái đứng riêng (preload, test) có store riêng
+        store = getattr(game, "enemy_store", None)
+        if store is None or store.path is not path:
+            store = EnemyStore(path)
+        self.store = store
+        self.slot = store.allocate(self)
+        self.type_id = ENEMY_TYPE_IDS[self.sprite_type]
         grid_x, grid_y = path[0]
         self.x = grid_x * GRID_SIZE + GRID_SIZE // 2
         self.y = grid_y * GRID_SIZE + GRID_SIZE // 2
+        self.prev_x = self.x
+        self.prev_y = self.y
         self.speed = speed
         self.max_health = health
         self.health = health
         self.reward = reward
         self.radius = 15
-        self.reached_end = False
         self.game = game
         self.damage = 5  # Reduced base damage for all enemies (was 10)
-        self.attack_cooldown = 0  # Add attack cooldown
         self.attack_rate = 30  # Attack every 30 frames (0.5 seconds at 60 FPS)
-        self.angle = 0
-        self.slow_timer = 0
         self.original_speed = speed
+        self._frames = None
+        self.current_frame = 0
+        self.animation_timer = 0
+        self.animation_speed = 5
 
     def move(self):
-        if not self.path_index < len(self.path) - 1:
-            self.reached_end = True
+        # Cả đàn quái được di chuyển một lần bằng EnemyStore.step(); hàm này chỉ bước riêng quái này
+        self.store.step(self.game.soldiers if self.game else (), np.array([self.slot]))
+
+    @property
+    def frames(self) -> Tuple[pygame.Surface, ...]:
+        # Chỉ tải ảnh khi vẽ lần đầu, mô phỏng không cần đến sprite
+        if self._frames is None:
+            self._frames = load_enemy_row_frames(*ENEMY_SPRITE_SHEETS[self.sprite_type]) if self.sprite_type else ()
+        return self._frames
+
+    @property
+    def frame_count(self) -> int:
+        return ENEMY_SPRITE_SHEETS[self.sprite_type][4] if self.sprite_type else 0
+
+    def animate(self):
+        """Advance the walk animation by one simulation tick."""
+        if not self.frame_count:
             return
-            
-        # Get current and next position
-        current_x, current_y = self.path[self.path_index]
-        next_x, next_y = self.path[self.path_index + 1]
-        
-        # Update attack cooldown
-        if self.attack_cooldown > 0:
-            self.attack_cooldown -= 1
-        
-        # Check if there's a soldier blocking the next position
-        for soldier in self.game.soldiers:
-            if soldier.grid_x == next_x and soldier.grid_y == next_y:
-                # Attack the soldier only if cooldown is ready
-                if self.attack_cooldown <= 0:
-                    soldier.take_damage(self.damage)
-                    self.attack_cooldown = self.attack_rate
-                return
-        
-        # Move towards next position if not attacking
-        target_x = next_x * GRID_SIZE + GRID_SIZE // 2
-        target_y = next_y * GRID_SIZE + GRID_SIZE // 2
-        
-        dx = target_x - self.x
-        dy = target_y - self.y
-        distance = math.sqrt(dx * dx + dy * dy)
-
-        self.angle = math.degrees(math.atan2(dy, dx))
-        
-        if distance < self.speed:
-            self.path_index += 1
-            self.x = target_x
-            self.y = target_y
-        else:
-            self.x += (dx / distance) * self.speed
-            self.y += (dy / distance) * self.speed
-
-        # Giảm thời gian slow
-        if self.slow_timer > 0:
-            self.slow_timer -= 1
-            if self.slow_timer <= 0:
-                self.speed = self.original_speed  # reset về tốc độ ban đầu
+        self.animation_timer += 1
+        if self.animation_timer >= self.animation_speed:
+            self.animation_timer = 0
+            self.current_frame = (self.current_frame + 1) % self.frame_count
 
     def take_damage(self, damage: int):
         self.health -= damage
@@ -76,17 +101,23 @@ class Enemy:
     def is_dead(self) -> bool:
         return self.health <= 0
 
-    def draw(self, screen: pygame.Surface):
+    def emit(self, queue: RenderQueue):
         # Draw enemy
-        pygame.draw.circle(screen, RED, (int(self.x), int(self.y)), self.radius)
+        x, y = queue.position(self)
+        queue.add_primitive(LAYER_ENEMIES, pygame.draw.circle, RED, (int(x), int(y)), self.radius)
         
-        # Draw health bar
-        health_bar_length = 30
-        health_ratio = self.health / self.max_health
-        health_bar_width = max(0, health_ratio * health_bar_length)
-        
-        pygame.draw.rect(screen, RED, (int(self.x) - health_bar_length//2, int(self.y) - 25, health_bar_length, 5))
-        pygame.draw.rect(screen, GREEN, (int(self.x) - health_bar_length//2, int(self.y) - 25, int(health_bar_width), 5))
+        # Thanh máu được vẽ gộp sau tất cả sprite
+        health_bars.emit(queue, x, y, 30, 25, self.health, self.max_health)
+
+    def get_dirty_rect(self) -> pygame.Rect:
+        # Sprite đã xoay + thanh máu (rộng tối đa 60, cao hơn tâm 30)
+        half = 32
+        frames = getattr(self, "frames", None)
+        if frames:
+            width, height = frames[0].get_size()
+            half = max(half, int(math.hypot(width, height) / 2) + 1)
+        # Gồm cả vị trí tick trước vì frame được vẽ ở vị trí nội suy giữa hai tick
+        return centered_rect(self.prev_x, self.prev_y, half, centered_rect(self.x, self.y, half))
 
     def apply_slow(self, factor: float, duration: int):
         if self.speed > self.original_speed * factor:
@@ -95,152 +126,105 @@ class Enemy:
 
 
 class BasicEnemy(Enemy):
+    sprite_type = "basic"
+
     def __init__(self, path: List[Tuple[int, int]], game=None):
         super().__init__(path, speed=1.0, health=50, reward=5, game=game)
         self.damage = 10
 
-        self.frames = load_enemy_row_frames("assets/enemy/Magma Crab.png", 64, 64, row=4, num_cols=8,scale_width = 64)
-
         self.current_frame = 0
         self.animation_timer = 0
         self.animation_speed = 5
     
-    def draw(self, screen: pygame.Surface):
-        self.animation_timer += 1
-        if self.animation_timer >= self.animation_speed:
-            self.animation_timer = 0
-            self.current_frame = (self.current_frame + 1) % len(self.frames)
-
+    def emit(self, queue: RenderQueue):
+        x, y = queue.position(self)
         frame = self.frames[self.current_frame]
         angle_offset = -90
-        rotated = pygame.transform.rotate(frame, -self.angle + angle_offset )
-        rect = rotated.get_rect(center=(int(self.x), int(self.y)))
-        screen.blit(rotated, rect)
-
-        # Draw health bar
-        health_bar_length = 30
-        health_ratio = self.health / self.max_health
-        health_bar_width = max(0, health_ratio * health_bar_length)
-        
-        pygame.draw.rect(screen, RED, (int(self.x) - health_bar_length//2, int(self.y) - 25, health_bar_length, 5))
-        pygame.draw.rect(screen, GREEN, (int(self.x) - health_bar_length//2, int(self.y) - 25, int(health_bar_width), 5))
+        rotated = sprite_cache.get_rotated(frame, -self.angle + angle_offset, lod.rotation_steps(queue.lod_level))
+        queue.add_centered(LAYER_ENEMIES, rotated, x, y)
+
+        # Thanh máu được vẽ gộp sau tất cả sprite
+        health_bars.emit(queue, x, y, 30, 25, self.health, self.max_health)
 
 
 class FastEnemy(Enemy):
+    sprite_type = "fast"
+
     def __init__(self, path: List[Tuple[int, int]], game=None):
         super().__init__(path, speed=2.0, health=30, reward=7, game=game)
         self.damage = 3  # Fast enemy does less damage but attacks quickly
         self.attack_rate = 20  # Attacks more frequently
 
-        self.frames = load_enemy_row_frames("assets/enemy/Leafbug.png", 64, 64, row=4, num_cols=8,scale_width = 64)
-
         self.current_frame = 0
         self.animation_timer = 0
         self.animation_speed = 5
     
-    def draw(self, screen: pygame.Surface):
-
-        self.animation_timer += 1
-        if self.animation_timer >= self.animation_speed:
-            self.animation_timer = 0
-            self.current_frame = (self.current_frame + 1) % len(self.frames)
-
+    def emit(self, queue: RenderQueue):
+        x, y = queue.position(self)
         frame = self.frames[self.current_frame]
         angle_offset = -90
-        rotated = pygame.transform.rotate(frame, -self.angle + angle_offset)
-        rect = rotated.get_rect(center=(int(self.x), int(self.y)))
-        screen.blit(rotated, rect)
-        # Draw health bar
-        health_bar_length = 30
-        health_ratio = self.health / self.max_health
-        health_bar_width = max(0, health_ratio * health_bar_length)
-        
-        pygame.draw.rect(screen, RED, (int(self.x) - health_bar_length//2, int(self.y) - 25, health_bar_length, 5))
-        pygame.draw.rect(screen, GREEN, (int(self.x) - health_bar_length//2, int(self.y) - 25, int(health_bar_width), 5))
+        rotated = sprite_cache.get_rotated(frame, -self.angle + angle_offset, lod.rotation_steps(queue.lod_level))
+        queue.add_centered(LAYER_ENEMIES, rotated, x, y)
+        # Thanh máu được vẽ gộp sau tất cả sprite
+        health_bars.emit(queue, x, y, 30, 25, self.health, self.max_health)
 
 
 class TankEnemy(Enemy):
+    sprite_type = "tank"
+
     def __init__(self, path: List[Tuple[int, int]], game=None):
         super().__init__(path, speed=1.0, health=150, reward=10, game=game)
         self.radius = 20
         self.damage = 12  # Tank does more damage but is slower
         self.attack_rate = 45  # Attacks more slowly
 
-        self.frames = load_enemy_row_frames("assets/enemy/Firebug.png", 128, 64, row=4, num_cols=8,scale_width = 128)
-
         self.current_frame = 0
         self.animation_timer = 0
         self.animation_speed = 5
     
-    def draw(self, screen: pygame.Surface):
-        self.animation_timer += 1
-        if self.animation_timer >= self.animation_speed:
-            self.animation_timer = 0
-            self.current_frame = (self.current_frame + 1) % len(self.frames)
-
+    def emit(self, queue: RenderQueue):
+        x, y = queue.position(self)
         frame = self.frames[self.current_frame]
         angle_offset = -90
-        rotated = pygame.transform.rotate(frame, -self.angle + angle_offset)
-        rect = rotated.get_rect(center=(int(self.x), int(self.y)))
-        screen.blit(rotated, rect)
-        # Draw health bar
-        health_bar_length = 40
-        health_ratio = self.health / self.max_health
-        health_bar_width = max(0, health_ratio * health_bar_length)
-        
-        pygame.draw.rect(screen, RED, (int(self.x) - health_bar_length//2, int(self.y) - 30, health_bar_length, 5))
-        pygame.draw.rect(screen, GREEN, (int(self.x) - health_bar_length//2, int(self.y) - 30, int(health_bar_width), 5)) 
+        rotated = sprite_cache.get_rotated(frame, -self.angle + angle_offset, lod.rotation_steps(queue.lod_level))
+        queue.add_centered(LAYER_ENEMIES, rotated, x, y)
+        # Thanh máu được vẽ gộp sau tất cả sprite
+        health_bars.emit(queue, x, y, 40, 30, self.health, self.max_health)
 
 class Boss(Enemy):
+    sprite_type = "boss"
+
     def __init__(self, path: List[Tuple[int, int]], game=None):
         super().__init__(path, speed=1.25, health=400, reward=30, game=game)
         self.radius = 25
         self.damage = 20  # Boss does high damage
         self.attack_rate = 45
 
-        self.frames = load_enemy_row_frames("assets/enemy/Scorpion.png", 64, 64, row=4, num_cols=8,scale_width = 64)
-
         self.current_frame = 0
         self.animation_timer = 0
         self.animation_speed = 5
     
-    def draw(self, screen: pygame.Surface):
-        self.animation_timer += 1
-        if self.animation_timer >= self.animation_speed:
-            self.animation_timer = 0
-            self.current_frame = (self.current_frame + 1) % len(self.frames)
-
+    def emit(self, queue: RenderQueue):
+        x, y = queue.position(self)
         frame = self.frames[self.current_frame]
         angle_offset = -90
-        rotated = pygame.transform.rotate(frame, -self.angle + angle_offset)
-        rect = rotated.get_rect(center=(int(self.x), int(self.y)))
-        screen.blit(rotated, rect)
-        #Draw health bar
-        health_bar_length = 60
-        health_ratio = self.health / self.max_health
-        health_bar_width = max(0, health_ratio * health_bar_length)
-
-        pygame.draw.rect(screen, RED, (int(self.x) - health_bar_length//2, int(self.y) - 30, health_bar_length, 5))
-        pygame.draw.rect(screen, GREEN, (int(self.x) - health_bar_length//2, int(self.y) - 30, int(health_bar_width), 5)) 
+        rotated = sprite_cache.get_rotated(frame, -self.angle + angle_offset, lod.rotation_steps(queue.lod_level))
+        queue.add_centered(LAYER_ENEMIES, rotated, x, y)
+        # Thanh máu được vẽ gộp sau tất cả sprite
+        health_bars.emit(queue, x, y, 60, 30, self.health, self.max_health)
     
-def load_enemy_row_frames(path: str, frame_width: int, frame_height: int, row: int, num_cols: int, scale_width: int = GRID_SIZE) -> List[pygame.Surface]:
+def load_enemy_row_frames(path: str, frame_width: int, frame_height: int, row: int, num_cols: int, scale_width: int = GRID_SIZE) -> Tuple[pygame.Surface, ...]:
     """
     Cắt một hàng cụ thể từ sprite sheet thành danh sách frame.
+    Kết quả được cache theo (path, kích thước frame, row, num_cols, scale) và dùng chung
+    cho mọi enemy, nên sheet chỉ bị decode và scale một lần.
 
     :param path: đường dẫn đến file ảnh
     :param frame_width: chiều rộng mỗi frame
     :param frame_height: chiều cao mỗi frame
     :param row: hàng muốn cắt (tính từ 0)
     :param num_cols: số lượng cột trong hàng đó
-    :return: list các frame đã cắt
+    :return: tuple các frame đã cắt (dùng chung, không được sửa)
     """
-    sheet = pygame.image.load(path).convert_alpha()
-    frames = []
     scale_height = int(scale_width * frame_height / frame_width)  # duy trì tỉ lệ gốc
-    for col in range(num_cols):
-        x = col * frame_width
-        y = row * frame_height
-        frame = sheet.subsurface(pygame.Rect(x, y, frame_width, frame_height))
-        frame = pygame.transform.scale(frame, (scale_width, scale_height))
-        frames.append(frame)
-    return frames
\ No newline at end of file
+    return sprite_cache.load_row_frames(path, frame_width, frame_height, row, num_cols, scale_width, scale_height)
@@ -0,0 +1,198 @@
+import numpy as np
+from typing import Dict, List, Optional
+from constants import *
+
+# Mã số loại quái (Enemy.sprite_type) trong mảng type_id
+ENEMY_TYPE_IDS = {None: 0, "basic": 1, "fast": 2, "tank": 3, "boss": 4}
+
+# Các thuộc tính của Enemy được giữ trong mảng song song: tên -> dtype
+ENEMY_FIELDS = {
+    "x": np.float64,
+    "y": np.float64,
+    "prev_x": np.float64,
+    "prev_y": np.float64,
+    "speed": np.float64,
+    "original_speed": np.float64,
+    "health": np.float64,
+    "progress": np.float64,
+    "angle": np.float64,
+    "path_index": np.int64,
+    "slow_timer": np.int64,
+    "attack_cooldown": np.int64,
+    "type_id": np.int64,
+    "reached_end": np.bool_,
+}
+INITIAL_CAPACITY = 64
+
+
+class StoreField:
+    """
+    Enemy attribute kept in its EnemyStore array at the enemy's slot.
+    Sau release(), enemy.store chỉ là dict tên trường -> giá trị cuối cùng (không có .arrays).
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, enemy, owner=None):
+        if enemy is None:
+            return self
+        try:
+            # item() trả về số Python (float/int/bool), không phải scalar NumPy
+            return enemy.store.arrays[self.name].item(enemy.slot)
+        except AttributeError:
+            return enemy.store[self.name]
+
+    def __set__(self, enemy, value):
+        try:
+            enemy.store.arrays[self.name][enemy.slot] = value
+        except AttributeError:
+            enemy.store[self.name] = value
+
+
+class EnemyStore:
+    """
+    Structure-of-arrays storage for the enemies walking one path.
+    Enemy chỉ là proxy (store, slot); mỗi tick step() di chuyển, xử lý lính chặn đường
+    và hết slow cho mọi quái bằng vài phép toán NumPy thay vì gọi Enemy.move() từng con.
+    """
+
+    def __init__(self, path, capacity: int = INITIAL_CAPACITY):
+        self.path = path
+        half = GRID_SIZE // 2
+        # Toạ độ tâm từng ô của path
+        self.path_x = np.array([grid_x * GRID_SIZE + half for grid_x, _ in path], dtype=np.float64)
+        self.path_y = np.array([grid_y * GRID_SIZE + half for _, grid_y in path], dtype=np.float64)
+        self.arrays: Dict[str, np.ndarray] = {name: np.zeros(capacity, dtype) for name, dtype in ENEMY_FIELDS.items()}
+        self.active = np.zeros(capacity, dtype=bool)
+        # Thứ tự cấp slot, tăng dần: slot được dùng lại nên số slot không phản ánh thứ tự xuất hiện
+        self.spawn_seq = np.zeros(capacity, dtype=np.int64)
+        self.next_seq = 0
+        self.entities: List = [None] * capacity
+        self.free: List[int] = list(range(capacity - 1, -1, -1))
+
+    def __len__(self):
+        return int(np.count_nonzero(self.active))
+
+    def _grow(self):
+        capacity = len(self.active)
+        for name, array in self.arrays.items():
+            self.arrays[name] = np.concatenate((array, np.zeros(capacity, array.dtype)))
+        self.active = np.concatenate((self.active, np.zeros(capacity, dtype=bool)))
+        self.spawn_seq = np.concatenate((self.spawn_seq, np.zeros(capacity, dtype=np.int64)))
+        self.entities.extend([None] * capacity)
+        self.free.extend(range(2 * capacity - 1, capacity - 1, -1))
+
+    def allocate(self, enemy) -> int:
+        """Reserve a zeroed slot for enemy and return it."""
+        if not self.free:
+            self._grow()
+        slot = self.free.pop()
+        for array in self.arrays.values():
+            array[slot] = 0
+        self.active[slot] = True
+        self.spawn_seq[slot] = self.next_seq
+        self.next_seq += 1
+        self.entities[slot] = enemy
+        return slot
+
+    def release(self, enemy):
+        """
+        Free enemy's slot once it has left the game.
+        Proxy giữ lại bản chép giá trị hiện tại (dict tên trường -> giá trị), để đạn hoặc tháp
+        còn giữ tham chiếu không đọc nhầm quái mới dùng lại slot này.
+        """
+        slot = enemy.slot
+        enemy.store = {name: array.item(slot) for name, array in self.arrays.items()}
+        self.active[slot] = False
+        self.entities[slot] = None
+        self.free.append(slot)
+
+    def step(self, soldiers, slots: Optional[np.ndarray] = None):
+        """One movement tick, same rules as Enemy.move(), for the given slots (default: every live enemy)."""
+        if slots is None:
+            slots = np.flatnonzero(self.active)
+        if not len(slots):
+            return
+        a = self.arrays
+        x = a["x"][slots]
+        y = a["y"][slots]
+        a["prev_x"][slots] = x
+        a["prev_y"][slots] = y
+        path_index = a["path_index"][slots]
+
+        # Quái đã ở ô cuối: đánh dấu tới đích, không đi nữa
+        at_end = path_index >= len(self.path) - 1
+        if at_end.any():
+            ends = slots[at_end]
+            a["reached_end"][ends] = True
+            a["progress"][ends] = path_index[at_end]
+            moving = ~at_end
+            slots, x, y, path_index = slots[moving], x[moving], y[moving], path_index[moving]
+            if not len(slots):
+                return
+
+        cooldown = a["attack_cooldown"][slots]
+        a["attack_cooldown"][slots] = np.where(cooldown > 0, cooldown - 1, cooldown)
+
+        # Lính đứng ở ô kế tiếp chặn đường; quái bị chặn tấn công lính khi hồi chiêu xong và đứng yên
+        next_index = path_index + 1
+        if soldiers:
+            soldier_at = {}
+            for soldier in soldiers:
+                soldier_at.setdefault((soldier.grid_x, soldier.grid_y), soldier)
+            occupied = np.array([tile in soldier_at for tile in self.path])
+            blocked = occupied[next_index]
+            if blocked.any():
+                for slot, tile_index in zip(slots[blocked], next_index[blocked]):
+                    if a["attack_cooldown"][slot] <= 0:
+                        enemy = self.entities[slot]
+                        soldier_at[self.path[tile_index]].take_damage(enemy.damage)
+                        a["attack_cooldown"][slot] = enemy.attack_rate
+                walking = ~blocked
+                slots, x, y = slots[walking], x[walking], y[walking]
+                path_index, next_index = path_index[walking], next_index[walking]
+                if not len(slots):
+                    return
+
+        target_x = self.path_x[next_index]
+        target_y = self.path_y[next_index]
+        dx = target_x - x
+        dy = target_y - y
+        distance = np.sqrt(dx * dx + dy * dy)
+        a["angle"][slots] = np.degrees(np.arctan2(dy, dx))
+
+        speed = a["speed"][slots]
+        arrived = distance < speed
+        with np.errstate(divide="ignore", invalid="ignore"):
+            a["x"][slots] = np.where(arrived, target_x, x + (dx / distance) * speed)
+            a["y"][slots] = np.where(arrived, target_y, y + (dy / distance) * speed)
+        a["progress"][slots] = np.where(arrived, next_index,
+                                        path_index + np.maximum(0.0, 1 - (distance - speed) / GRID_SIZE))
+        a["path_index"][slots] = np.where(arrived, next_index, path_index)
+
+        # Giảm thời gian slow, hết thì trả lại tốc độ ban đầu
+        slow_timer = a["slow_timer"][slots]
+        slowed = slow_timer > 0
+        if slowed.any():
+            slow_timer = np.where(slowed, slow_timer - 1, slow_timer)
+            a["slow_timer"][slots] = slow_timer
+            expired = slots[slowed & (slow_timer <= 0)]
+            a["speed"][expired] = a["original_speed"][expired]
+
+    def enemies_where(self, mask: np.ndarray) -> List:
+        return [self.entities[slot] for slot in np.flatnonzero(mask & self.active)]
+
+    def reached_end_enemies(self) -> List:
+        return self.enemies_where(self.arrays["reached_end"])
+
+    def dead_enemies(self) -> List:
+        """Enemies with no health left that did not reach the end this tick."""
+        return self.enemies_where((self.arrays["health"] <= 0) & ~self.arrays["reached_end"])
+
+    def moved_cell_enemies(self, cell_size: int) -> List:
+        """Enemies whose last step took them into another cell of a cell_size grid."""
+        a = self.arrays
+        changed = ((a["x"] // cell_size != a["prev_x"] // cell_size) |
+                   (a["y"] // cell_size != a["prev_y"] // cell_size))
+        return self.enemies_where(changed)
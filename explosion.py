@@ -1,27 +1,32 @@
 import pygame
+from typing import List, Optional, Sequence
+import sprite_cache
+from render_queue import RenderQueue, LAYER_EXPLOSIONS
+
+EXPLOSION_SHEET = "assets/effect/sniper_bullet.png"
+# 8 frame 48x48, scale lên 64x64: (path, frame_width, frame_height, row, num_cols, scale_width, scale_height)
+EXPLOSION_FRAMES = (EXPLOSION_SHEET, 48, 48, 0, 8, 64, 64)
+MAX_LIVE_EXPLOSIONS = 64
+
+
+def load_explosion_frames():
+    # Decode một lần và dùng chung
+    return sprite_cache.load_row_frames(*EXPLOSION_FRAMES)
+
 
 class Explosion:
-    def __init__(self, x, y):
+    def __init__(self, x, y, frames: Optional[Sequence[pygame.Surface]] = None):
+        self.frames = frames if frames is not None else load_explosion_frames()
+        self.frame_delay = 3  # số frame chờ giữa các hình
+        self.reset(x, y)
+
+    def reset(self, x, y):
         self.x = x
         self.y = y
-        self.frames = []
         self.current_frame = 0
-        self.frame_delay = 3  # số frame chờ giữa các hình
         self.timer = 0
         self.finished = False
 
-        # Load sprite sheet
-        sheet = pygame.image.load("assets/effect/sniper_bullet.png").convert_alpha()
-        frame_width = 48
-        frame_height = 48
-        num_frames = 8
-
-        for i in range(num_frames):
-            frame = sheet.subsurface(pygame.Rect(i * frame_width, 0, frame_width, frame_height))
-            # Scale lên nếu cần (ví dụ 2x):
-            frame = pygame.transform.scale(frame, (64, 64))
-            self.frames.append(frame)
-
     def update(self):
         self.timer += 1
         if self.timer >= self.frame_delay:
@@ -30,8 +35,66 @@ class Explosion:
             if self.current_frame >= len(self.frames):
                 self.finished = True
 
-    def draw(self, screen):
+    def get_dirty_rect(self) -> pygame.Rect:
+        return self.frames[0].get_rect(center=(int(self.x), int(self.y)))
+
+    def emit(self, queue: RenderQueue):
         if not self.finished:
-            frame = self.frames[self.current_frame]
-            rect = frame.get_rect(center=(int(self.x), int(self.y)))
-            screen.blit(frame, rect.topleft)
+            queue.add_centered(LAYER_EXPLOSIONS, self.frames[self.current_frame], self.x, self.y)
+
+
+class ExplosionPool:
+    """Reuses finished Explosion objects and caps how many are alive at once."""
+
+    def __init__(self, max_live: int = MAX_LIVE_EXPLOSIONS):
+        self.max_live = max_live
+        self.live: List[Explosion] = []
+        self.free: List[Explosion] = []
+
+    def set_max_live(self, max_live: int):
+        """Change the cap; when it shrinks, the oldest live effects are released right away."""
+        self.max_live = max_live
+        excess = len(self.live) - max_live
+        if excess > 0:
+            self.free.extend(self.live[:excess])
+            self.live = self.live[excess:]
+
+    def spawn(self, x, y) -> Explosion:
+        if len(self.live) >= self.max_live:
+            # Hết chỗ: tái dùng hiệu ứng cũ nhất thay vì tạo thêm
+            explosion = self.live.pop(0)
+            explosion.reset(x, y)
+        elif self.free:
+            explosion = self.free.pop()
+            explosion.reset(x, y)
+        else:
+            explosion = Explosion(x, y)
+        self.live.append(explosion)
+        return explosion
+
+    def update(self):
+        still_live = []
+        for explosion in self.live:
+            explosion.update()
+            if explosion.finished:
+                self.free.append(explosion)
+            else:
+                still_live.append(explosion)
+        self.live = still_live
+
+    def emit(self, queue: RenderQueue):
+        for explosion in self.live:
+            explosion.emit(queue)
+
+    def get_dirty_rects(self) -> List[pygame.Rect]:
+        return [explosion.get_dirty_rect() for explosion in self.live]
+
+    def clear(self):
+        self.free.extend(self.live)
+        self.live = []
+
+    def __iter__(self):
+        return iter(self.live)
+
+    def __len__(self):
+        return len(self.live)
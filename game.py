@@ -1,31 +1,52 @@
 import pygame
 import sys
 import math
-import random
+import time
 from typing import List, Tuple, Dict, Optional
 
 from constants import *
-from tower import Tower, BasicTower, RapidTower, SniperTower,LaserTower,SlowTower
 from soldier import Soldier
-from enemy import Enemy, BasicEnemy, FastEnemy, TankEnemy, Boss
-from projectile import Projectile
+from enemy import Enemy
 from menu import Menu
-from maps import get_map_path, get_map_description, get_difficulty_settings
-from explosion import Explosion
+from maps import get_map_description, get_map_image_path
+from explosion import ExplosionPool
+import sound_bank
+import sprite_cache
+from text_cache import render_text, draw_counter
+from dirty_renderer import DirtyRectRenderer, centered_rect
+import overlays
+from render_queue import RenderQueue, LAYER_ENEMIES
+from sim_clock import FixedStepClock
+import lod
+from lod import LodPolicy, LOD_NO_ANIMATION, LOD_CLUSTERS, LOD_CLUSTER_COLOR, LOD_ENTITY_THRESHOLDS
+from governor import FrameGovernor
+from simulation import Simulation
+
+class Game(Simulation):
+    """Presenter on top of Simulation: display, input, audio and effects."""
 
-class Game:
     def __init__(self, map_name: str = "Forest", difficulty: str = "Medium"):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), DISPLAY_FLAGS)
         pygame.display.set_caption("Tower Defense 8-bit")
         self.clock = pygame.time.Clock()
         
-        self.map_name = map_name
-        self.difficulty = difficulty
-        self.reset_game()
-        self.current_path = get_map_path(self.map_name)
+        # Chỉ cập nhật phần màn hình thay đổi; tắt để luôn vẽ lại và flip toàn bộ
+        self.dirty_rendering = True
+        self.renderer = DirtyRectRenderer()
+        self.frame_dirty_rects = []
+        self.hud_state = None
+        self.render_queue = RenderQueue()
+        # Mô phỏng chạy theo tick cố định, độc lập với tốc độ vẽ
+        self.sim_clock = FixedStepClock()
+        self.explosions = ExplosionPool()
+        # Hạ/nâng chất lượng theo thời gian update + draw đo được
+        self.governor = FrameGovernor(on_change=self.apply_quality_tier)
+        self.update_ms = 0.0
+        super().__init__(map_name, difficulty)
         self.background_image = self.load_map_image(self.map_name)  # Thêm dòng này
-        self.explosions = []
-        self.auto_wave = False
+        self.show_path_tiles = False  # Vẽ ô đường đi lên lớp nền tĩnh
+        self.static_layer = None
+        self.static_layer_key = None
 
         # Play background music only when entering the game screen
         if pygame.mixer.get_init():
@@ -36,263 +57,66 @@ class Game:
                 pygame.mixer.music.set_volume(0.4)
                 pygame.mixer.music.play(-1)  # Loop
 
-    def add_explosion(self, x, y):
-        self.explosions.append(Explosion(x, y))
-
-    def load_map_image(self, map_name: str) -> Optional[pygame.Surface]:
-        image_path = f"assets/map/{map_name.lower().replace(' ', '_')}.png"  # Giả sử bạn lưu ảnh trong thư mục assets/maps và định dạng là .png
-        try:
-            image = pygame.image.load(image_path).convert_alpha()
-            # Kéo dài hình ảnh để vừa với khu vực trò chơi (SCREEN_WIDTH - 200, SCREEN_HEIGHT)
-            return pygame.transform.scale(image, (SCREEN_WIDTH - 200, SCREEN_HEIGHT))
-        except pygame.error as e:
-            print(f"Không thể tải hình ảnh bản đồ {image_path}: {e}")
-            return None
     def reset_game(self):
-        # Get difficulty settings
-        settings = get_difficulty_settings(self.difficulty)
-        
-        self.gold = settings["starting_gold"]
-        self.lives = settings["starting_lives"]
-        self.wave = 1
-        self.game_over = False
-        self.wave_in_progress = False
-        self.towers: List[Tower] = []
-        self.soldiers: List[Soldier] = []
-        self.enemies: List[Enemy] = []
-        self.projectiles: List[Projectile] = []
+        super().reset_game()
         self.menu = Menu()
         self.selected_tower_type = None
         self.selected_tower = None
         self.selected_unit = None
         self.dragging_unit = None
         self.dragging_enabled = False
-        # Get map path
-        self.current_path = get_map_path(self.map_name)
-
-        self.killed_enemies = 0
-
-    def is_valid_tower_position(self, grid_x: int, grid_y: int) -> bool:
-        # Check if position is on a path
-        if (grid_x, grid_y) in self.current_path:
-            return False
-        
-        # Check if position is already occupied by a tower
-        for tower in self.towers:
-            if tower.grid_x == grid_x and tower.grid_y == grid_y:
-                return False
-        
-        # Check if position is within game boundaries
-        if grid_x < 0 or grid_x >= SCREEN_WIDTH // GRID_SIZE - 5 or grid_y < 0 or grid_y >= SCREEN_HEIGHT // GRID_SIZE:
-            return False
-            
-        return True
+        self.renderer.invalidate()
+        self.sim_clock.reset()
+        self.lod = LodPolicy()
+        self.apply_quality_tier(self.governor.tier)
 
-    def is_valid_soldier_position(self, grid_x: int, grid_y: int) -> bool:
-        # Check if position is on a path
-        if (grid_x, grid_y) not in self.current_path:
-            return False
-            
-        # Check if position is already occupied by a soldier
-        for soldier in self.soldiers:
-            if soldier.grid_x == grid_x and soldier.grid_y == grid_y:
-                return False
-                
-        # Check if position is within game boundaries
-        if grid_x < 0 or grid_x >= SCREEN_WIDTH // GRID_SIZE - 5 or grid_y < 0 or grid_y >= SCREEN_HEIGHT // GRID_SIZE:
-            return False
-            
-        return True
+    @property
+    def sound_enabled(self) -> bool:
+        return self.menu.sound_enabled
 
     def place_tower(self, grid_x: int, grid_y: int) -> bool:
-        # For soldiers, we need to check soldier position validity first
-        if self.selected_tower_type == "soldier" and self.gold >= 75:
-            if self.is_valid_soldier_position(grid_x, grid_y):
-                self.soldiers.append(Soldier(grid_x, grid_y))
-                self.gold -= 75
-                return True
-            return False
-            
-        # For towers, check tower position validity
-        if not self.is_valid_tower_position(grid_x, grid_y):
-            return False
-            
-        if self.selected_tower_type == "basic_tower" and self.gold >= 50:
-            tower = BasicTower(grid_x, grid_y)
-            tower.game = self
-            self.towers.append(tower)
-
-            self.gold -= 50
-            return True
-        elif self.selected_tower_type == "sniper_tower" and self.gold >= 100:
-            tower = SniperTower(grid_x, grid_y)
-            tower.game = self
-            self.towers.append(tower)
-
-            tower.game = self
-            self.towers.append(tower)
-            self.gold -= 100
-            return True
-
-        elif self.selected_tower_type == "rapid_tower" and self.gold >= 75:
-            tower = RapidTower(grid_x, grid_y)
-            tower.game = self
-            self.towers.append(tower)
-
-            self.gold -= 75
-            return True
-        elif self.selected_tower_type == "laser_tower" and self.gold >= 120:
-            tower = LaserTower(grid_x, grid_y)
-            tower.game = self
-            self.towers.append(tower)
-            self.gold -= 120
-            return True
-        elif self.selected_tower_type == "slow_tower" and self.gold >= 90:
-            tower = SlowTower(grid_x, grid_y)
-            tower.game = self
-            self.towers.append(tower)
-            self.gold -= 90
-            return True
-
-        return False
-    
-    def start_wave(self):
+        return self.place_unit(self.selected_tower_type, grid_x, grid_y)
 
-        self.wave_in_progress = True
-        self.spawn_enemies()
-    
-    def spawn_enemies(self):
-        settings = get_difficulty_settings(self.difficulty)
-        # Base number of enemies increases by 30% each wave
-        base_num_enemies = int(5 * (1.3 ** (self.wave - 1)))
-        num_enemies = int(base_num_enemies * settings["wave_size_multiplier"])
-        
-        # Different mix of enemies based on wave number
-        num_basic = max(3, num_enemies - self.wave * 2)
-        num_fast = min(self.wave, num_enemies // 3)
-        num_tank = max(0, min(self.wave // 3, 3))
-        num_boss = self.wave // 10
-        
-        # Spawn delay between enemies (decreases by 10% each wave, minimum 10)
-        self.spawn_delay = max(10, int(30 * (0.9 ** (self.wave - 1))))
-        self.spawn_counter = 0
-        
-        # Prepare enemy queue
-        self.enemy_queue = []
-        for _ in range(num_basic):
-            self.enemy_queue.append("basic")
-        for _ in range(num_fast):
-            self.enemy_queue.append("fast")
-        for _ in range(num_tank):
-            self.enemy_queue.append("tank")
-        for _ in range(num_boss):
-            self.enemy_queue.append('boss')
-        # Shuffle queue for variety
-        random.shuffle(self.enemy_queue)
-    
-    def spawn_enemy_from_queue(self):
-        if not self.enemy_queue:
-            return
-            
-        settings = get_difficulty_settings(self.difficulty)
-        enemy_type = self.enemy_queue.pop(0)
-        
-        if enemy_type == "basic":
-            enemy = BasicEnemy(self.current_path, self)
-        elif enemy_type == "fast":
-            enemy = FastEnemy(self.current_path, self)
-        elif enemy_type == "tank":
-            enemy = TankEnemy(self.current_path, self)
-        elif enemy_type == 'boss':
-            enemy = Boss(self.current_path, self)
-        
-        # Apply difficulty multipliers and wave scaling (10% increase per wave)
-        wave_multiplier = 1.0 + (0.1 * (self.wave - 1))  # 10% increase per wave
-        
-        enemy.health = int(enemy.health * settings["enemy_health_multiplier"] * wave_multiplier)
-        enemy.max_health = enemy.health
-        enemy.speed *= settings["enemy_speed_multiplier"] * wave_multiplier
-        enemy.reward = int(enemy.reward * settings["enemy_reward_multiplier"] * wave_multiplier)
-        enemy.damage = int(enemy.damage * settings["enemy_health_multiplier"] * wave_multiplier)
-        
-        self.enemies.append(enemy)
-    
     def update(self):
-        # Spawn enemies if wave in progress
-        if self.wave_in_progress and self.enemy_queue:
-            self.spawn_counter += 1
-            if self.spawn_counter >= self.spawn_delay:
-                self.spawn_counter = 0
-                self.spawn_enemy_from_queue()
-        
-        # Check if wave is complete
-        if self.wave_in_progress and not self.enemy_queue and not self.enemies:
-            self.wave_in_progress = False
-            self.wave += 1
-            self.gold += 30 + (self.wave * 2)
-
-            if self.auto_wave:
-                self.start_wave()
-
-        # Update towers
-        for tower in self.towers:
-            tower.update_cooldown(self.enemies)
-            if tower.can_fire():
-                target = tower.find_target(self.enemies)
-                if target:
-                    result = tower.fire(target)
-                    tower.reset_cooldown()
-
-                    if result:
-                        if isinstance(result, list):
-                            self.projectiles.extend(result)
-                        else:
-                            self.projectiles.append(result)
-        
-        # Update soldiers
-        for soldier in self.soldiers[:]:
-            soldier.update_cooldown()
-            if soldier.can_attack():
-                target = soldier.find_target(self.enemies)
-                if target:
-                    soldier.attack(target)
-                    soldier.reset_cooldown()
-            
-            # Remove dead soldiers
-            if soldier.is_dead():
-                self.soldiers.remove(soldier)
-        
-        # Update projectiles
-        for projectile in self.projectiles[:]:
-            if projectile.move():
-                self.projectiles.remove(projectile)
-        
-        # Update enemies
-        for enemy in self.enemies[:]:
-            enemy.move()
-            
-            # Check if enemy reached the end
-            if enemy.reached_end:
-                self.lives -= 1
-                self.enemies.remove(enemy)
-                if self.lives <= 0:
-                    self.game_over = True
-                continue
-                
-            # Check if enemy is dead
-            if enemy.is_dead():
-                self.gold += enemy.reward
-                self.killed_enemies += 1
-                self.enemies.remove(enemy)
-
-        for explosion in self.explosions[:]:
-            explosion.update()
-            if explosion.finished:
-                self.explosions.remove(explosion)
+        super().update()
+        if self.lod.level < LOD_NO_ANIMATION:
+            for enemy in self.enemies:
+                enemy.animate()
+        self.explosions.update()
 
-        self.sound_enabled = self.menu.sound_enabled
+    def add_explosion(self, x, y):
+        self.explosions.spawn(x, y)
 
-    def draw_grid(self):
+    def load_map_image(self, map_name: str) -> Optional[pygame.Surface]:
+        image_path = get_map_image_path(map_name)
+        try:
+            # Kéo dài hình ảnh để vừa với khu vực trò chơi (SCREEN_WIDTH - PANEL_WIDTH, SCREEN_HEIGHT);
+            # bản đã scale được cache trên đĩa theo độ phân giải
+            return sprite_cache.load_scaled_image(image_path, (SCREEN_WIDTH - PANEL_WIDTH, SCREEN_HEIGHT), keep_source=False)
+        except pygame.error as e:
+            print(f"Không thể tải hình ảnh bản đồ {image_path}: {e}")
+            return None
+    def apply_quality_tier(self, tier: Dict):
+        """Push a governor quality tier to the effects, sprite rotation, LOD and audio settings."""
+        self.explosions.set_max_live(tier["max_explosions"])
+        sprite_cache.set_rotation_steps(tier["rotation_steps"])
+        self.lod.entity_thresholds = tuple(int(threshold * tier["lod_scale"]) for threshold in LOD_ENTITY_THRESHOLDS)
+        sound_bank.set_voice_scale(tier["voice_scale"])
+
+    def advance(self, dt_ms: float) -> int:
+        """Run the fixed-rate ticks covered by dt_ms of real time; returns how many ran."""
+        started = time.perf_counter()
+        ticks = self.sim_clock.advance(dt_ms)
+        self.step(ticks)
+        self.update_ms += (time.perf_counter() - started) * 1000
+        self.render_queue.alpha = self.sim_clock.alpha
+        entity_count = len(self.enemies) + len(self.projectiles) + len(self.explosions)
+        self.render_queue.lod_level = self.lod.update(entity_count, dt_ms)
+        return ticks
+
+    def draw_grid(self, surface: Optional[pygame.Surface] = None):
+        if surface is None:
+            surface = self.screen
         # Set grid color based on map theme
         if self.map_name == "Forest":
             grid_color = (0, 100, 0)  # Dark forest green
@@ -304,13 +128,16 @@ class Game:
             grid_color = (50, 50, 50)
 
         # Draw grid lines
-        for x in range(0, SCREEN_WIDTH - 200, GRID_SIZE):
-            pygame.draw.line(self.screen, grid_color, (x, 0), (x, SCREEN_HEIGHT))
+        for x in range(0, SCREEN_WIDTH - PANEL_WIDTH, GRID_SIZE):
+            pygame.draw.line(surface, grid_color, (x, 0), (x, SCREEN_HEIGHT))
         for y in range(0, SCREEN_HEIGHT, GRID_SIZE):
-            pygame.draw.line(self.screen, grid_color, (0, y), (SCREEN_WIDTH - 200, y))
+            pygame.draw.line(surface, grid_color, (0, y), (SCREEN_WIDTH - PANEL_WIDTH, y))
     
-    def draw_path(self):
-        """
+    def draw_path(self, surface: Optional[pygame.Surface] = None):
+        if not self.show_path_tiles:
+            return
+        if surface is None:
+            surface = self.screen
         # Set path color based on map theme
         if self.map_name == "Forest":
             path_color = (139, 69, 19)  # Brown dirt path
@@ -322,34 +149,56 @@ class Game:
             path_color = BROWN
             
         for grid_x, grid_y in self.current_path:
-            pygame.draw.rect(self.screen, path_color, (grid_x * GRID_SIZE, grid_y * GRID_SIZE, GRID_SIZE, GRID_SIZE))
-        """
-        pass
+            pygame.draw.rect(surface, path_color, (grid_x * GRID_SIZE, grid_y * GRID_SIZE, GRID_SIZE, GRID_SIZE))
+
+    def build_static_layer(self) -> pygame.Surface:
+        """Background, grid and path composited once into one opaque surface."""
+        layer = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        if self.background_image:
+            layer.blit(self.background_image, (0, 0))
+        else:
+            # Nếu không có hình ảnh, vẫn tô màu nền như cũ
+            if self.map_name == "Forest":
+                layer.fill((34, 139, 34))
+            elif self.map_name == "Flame Desert":
+                layer.fill((210, 180, 140))
+            elif self.map_name == "Ice Kingdom":
+                layer.fill((240, 248, 255))
+            else:
+                layer.fill(DARK_GREEN)
+        self.draw_grid(layer)
+        self.draw_path(layer)
+        return layer
+
+    def get_static_layer(self) -> pygame.Surface:
+        # Chỉ dựng lại khi đổi map, độ phân giải hoặc bật/tắt ô đường đi
+        key = (self.map_name, SCREEN_WIDTH, SCREEN_HEIGHT, GRID_SIZE, self.show_path_tiles)
+        if self.static_layer is None or key != self.static_layer_key:
+            self.static_layer = self.build_static_layer()
+            self.static_layer_key = key
+        return self.static_layer
+
+    def invalidate_static_layer(self):
+        self.static_layer = None
 
     def draw_map_info(self):
         #draw game info
-        gold_text = GAME_FONT.render(f"Gold: {self.gold}", True, WHITE)
-        wave_text = GAME_FONT.render(f"Wave: {self.wave}", True, WHITE)
-        lives_text = GAME_FONT.render(f"Lives: {self.lives}", True, WHITE)
-        killed_text = GAME_FONT.render(f"Killed: {self.killed_enemies}", True, WHITE)
-
-        self.screen.blit(gold_text, (SCREEN_WIDTH - 190, 10))
-        self.screen.blit(wave_text, (SCREEN_WIDTH - 190, 35))
-        self.screen.blit(lives_text, (SCREEN_WIDTH - 190, 60))
-        self.screen.blit(killed_text, (SCREEN_WIDTH - 190, 85))
+        draw_counter(self.screen, GAME_FONT, "Gold: ", self.gold, WHITE, (SCREEN_WIDTH - 190, 10))
+        draw_counter(self.screen, GAME_FONT, "Wave: ", self.wave, WHITE, (SCREEN_WIDTH - 190, 35))
+        draw_counter(self.screen, GAME_FONT, "Lives: ", self.lives, WHITE, (SCREEN_WIDTH - 190, 60))
+        draw_counter(self.screen, GAME_FONT, "Killed: ", self.killed_enemies, WHITE, (SCREEN_WIDTH - 190, 85))
 
     def draw_game_over(self):
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
+        overlay = overlays.get_rect((SCREEN_WIDTH, SCREEN_HEIGHT), (0, 0, 0, 180))
         self.screen.blit(overlay, (0, 0))
         
         # Game over text
-        game_over_text = TITLE_FONT.render("GAME OVER", True, RED)
+        game_over_text = render_text(TITLE_FONT, "GAME OVER", RED)
         game_over_rect = game_over_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
         self.screen.blit(game_over_text, game_over_rect)
         
         # Wave reached text
-        wave_text = GAME_FONT.render(f"You reached Wave {self.wave}", True, WHITE)
+        wave_text = render_text(GAME_FONT, f"You reached Wave {self.wave}", WHITE)
         wave_rect = wave_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
         self.screen.blit(wave_text, wave_rect)
         
@@ -358,32 +207,68 @@ class Game:
         pygame.draw.rect(self.screen, (70, 70, 70), restart_button)
         pygame.draw.rect(self.screen, BLACK, restart_button, 2)
         
-        restart_text = GAME_FONT.render("Restart", True, WHITE)
+        restart_text = render_text(GAME_FONT, "Restart", WHITE)
         restart_rect = restart_text.get_rect(center=restart_button.center)
         self.screen.blit(restart_text, restart_rect)
         
         return restart_button
     
+    def get_hud_state(self):
+        # Mọi giá trị hiển thị trên panel bên phải; đổi giá trị nào thì panel phải vẽ lại
+        tower = self.selected_tower
+        tower_stats = (tower.level, tower.damage, tower.range, tower.fire_rate, tower.target_mode) if tower else None
+        return (self.gold, self.wave, self.lives, self.killed_enemies, self.dragging_enabled, tower_stats,
+                self.menu.selected_button, self.menu.sound_enabled, self.menu.music_enabled, self.menu.auto_wave)
+
+    def get_preview_rect(self) -> Optional[pygame.Rect]:
+        if not self.selected_tower_type:
+            return None
+        mouse_x, mouse_y = pygame.mouse.get_pos()
+        if mouse_x >= SCREEN_WIDTH - PANEL_WIDTH:
+            return None
+        center_x = mouse_x // GRID_SIZE * GRID_SIZE + GRID_SIZE // 2
+        center_y = mouse_y // GRID_SIZE * GRID_SIZE + GRID_SIZE // 2
+        # Bán kính lớn nhất của preview (sniper 200) và ô của tower
+        return centered_rect(center_x, center_y, max(200, GRID_SIZE))
+
+    def collect_dirty_rects(self) -> List[pygame.Rect]:
+        """Screen areas this frame will draw on (entities, previews and the panel when the HUD changed)."""
+        rects = [tower.get_dirty_rect(tower == self.selected_tower) for tower in self.towers]
+        rects.extend(soldier.get_dirty_rect() for soldier in self.soldiers)
+        rects.extend(enemy.get_dirty_rect() for enemy in self.enemies)
+        rects.extend(projectile.get_dirty_rect() for projectile in self.projectiles)
+        rects.extend(self.explosions.get_dirty_rects())
+
+        preview_rect = self.get_preview_rect()
+        if preview_rect:
+            rects.append(preview_rect)
+
+        hud_state = self.get_hud_state()
+        if hud_state != self.hud_state:
+            self.hud_state = hud_state
+            rects.append(pygame.Rect(SCREEN_WIDTH - PANEL_WIDTH, 0, PANEL_WIDTH, SCREEN_HEIGHT))
+        return rects
+
+    def emit_enemy_clusters(self, queue: RenderQueue) -> List[Enemy]:
+        """Queue one marker per crowded cell; returns the enemies still drawn individually."""
+        clusters, loose = lod.cluster_enemies(self.enemies, GRID_SIZE)
+        for x, y, count in clusters:
+            radius = min(GRID_SIZE // 2, 8 + count)
+            marker = overlays.get_circle(radius, LOD_CLUSTER_COLOR)
+            queue.add_centered(LAYER_ENEMIES, marker, x, y)
+            if self.dirty_rendering:
+                # Điểm đánh dấu có thể lệch khỏi rect của từng con quái
+                self.frame_dirty_rects.append(centered_rect(x, y, radius + 1))
+        return loose
+
     def draw(self):
-        # Draw background with map-specific theme
-        if self.background_image:
-            self.screen.blit(self.background_image, (0, 0))
+        started = time.perf_counter()
+        # Draw background, grid and path (pre-composited static layer)
+        if self.dirty_rendering:
+            self.frame_dirty_rects = self.collect_dirty_rects()
+            self.renderer.restore(self.screen, self.get_static_layer())
         else:
-            # Nếu không có hình ảnh, vẫn tô màu nền như cũ
-            if self.map_name == "Forest":
-                self.screen.fill((34, 139, 34))
-            elif self.map_name == "Flame Desert":
-                self.screen.fill((210, 180, 140))
-            elif self.map_name == "Ice Kingdom":
-                self.screen.fill((240, 248, 255))
-            else:
-                self.screen.fill(DARK_GREEN)
-        
-        # Draw grid
-        self.draw_grid()
-        
-        # Draw path
-        self.draw_path()
+            self.screen.blit(self.get_static_layer(), (0, 0))
         
         # Draw tower ranges
         for tower in self.towers:
@@ -395,25 +280,21 @@ class Game:
 
                 pygame.draw.circle(self.screen, (255, 255, 255), (center_x, center_y), radius, width=1)
 
-        # Draw towers
+        # Thu thập sprite của mọi entity rồi vẽ một lần theo lớp
+        queue = self.render_queue
         for tower in self.towers:
-            tower.draw(self.screen, tower == self.selected_tower)
-        
-        # Draw soldiers
+            tower.emit(queue, tower == self.selected_tower)
         for soldier in self.soldiers:
-            soldier.draw(self.screen)
-        
-        # Draw enemies
-        for enemy in self.enemies:
-            enemy.draw(self.screen)
-
-        #Draw explosion
-        for explosion in self.explosions:
-            explosion.draw(self.screen)
-
-        # Draw projectiles
+            soldier.emit(queue)
+        enemies = self.enemies
+        if queue.lod_level >= LOD_CLUSTERS:
+            enemies = self.emit_enemy_clusters(queue)
+        for enemy in enemies:
+            enemy.emit(queue)
+        self.explosions.emit(queue)
         for projectile in self.projectiles:
-            projectile.draw(self.screen)
+            projectile.emit(queue)
+        queue.flush(self.screen)
         
         # Draw menu
         self.menu.selected_tower = self.selected_tower
@@ -433,7 +314,7 @@ class Game:
         # Draw tower preview (when placing a new tower)
         if self.selected_tower_type:
             mouse_x, mouse_y = pygame.mouse.get_pos()
-            if mouse_x < SCREEN_WIDTH - 200:
+            if mouse_x < SCREEN_WIDTH - PANEL_WIDTH:
                 grid_x = mouse_x // GRID_SIZE
                 grid_y = mouse_y // GRID_SIZE
                 center_x = grid_x * GRID_SIZE + GRID_SIZE // 2
@@ -445,13 +326,11 @@ class Game:
                     if self.is_valid_soldier_position(grid_x, grid_y):
                         # Draw range circle
                         range_radius = 60
-                        radius_surface = pygame.Surface((range_radius * 2, range_radius * 2), pygame.SRCALPHA)
-                        pygame.draw.circle(radius_surface, (255, 255, 255, 50), (range_radius, range_radius), range_radius, width=1)
+                        radius_surface = overlays.get_circle(range_radius, (255, 255, 255, 50), width=1)
                         self.screen.blit(radius_surface, (center_x - range_radius, center_y - range_radius))
 
                         # Draw semi-transparent soldier preview
-                        s = pygame.Surface((30, 30), pygame.SRCALPHA)  # 30 is soldier diameter
-                        pygame.draw.circle(s, (0, 255, 0, 128), (15, 15), 15)  # Green semi-transparent circle
+                        s = overlays.get_circle(15, (0, 255, 0, 128))  # 30 is soldier diameter
                         self.screen.blit(s, (center_x - 15, center_y - 15))
                 else:
                     # Determine tower range (based on type)
@@ -469,23 +348,30 @@ class Game:
                         color = (0, 0, 0)
 
                     # Draw semi-transparent tower
-                    s = pygame.Surface((GRID_SIZE, GRID_SIZE), pygame.SRCALPHA)
-                    s.fill((*color, 100))  # semi-transparent
+                    s = overlays.get_rect((GRID_SIZE, GRID_SIZE), (*color, 100))  # semi-transparent
                     self.screen.blit(s, (grid_x * GRID_SIZE, grid_y * GRID_SIZE))
 
                     # Draw radius
-                    radius_surface = pygame.Surface((range_radius * 2, range_radius * 2), pygame.SRCALPHA)
-                    pygame.draw.circle(radius_surface, (255, 255, 255, 50), (range_radius, range_radius), range_radius)
+                    radius_surface = overlays.get_circle(range_radius, (255, 255, 255, 50))
                     self.screen.blit(radius_surface, (center_x - range_radius, center_y - range_radius))
 
-        # Update display
-        pygame.display.flip()
-        
+        # Thời gian update + draw của frame này cho bộ điều tốc
+        self.governor.record(self.update_ms + (time.perf_counter() - started) * 1000)
+        self.update_ms = 0.0
+
         return restart_button
+
+    def present(self):
+        """Push the frame drawn by draw() to the display."""
+        if self.dirty_rendering:
+            self.renderer.present(self.frame_dirty_rects, full=self.game_over)
+        else:
+            pygame.display.flip()
     
     def run(self):
         running = True
         restart_button = None
+        frame_ms = 0
         
         while running:
             for event in pygame.event.get():
@@ -511,6 +397,8 @@ class Game:
                                 self.start_wave()
                             elif tower_type == "toggle_auto_wave":
                                 self.auto_wave = self.menu.auto_wave
+                            elif tower_type == "cycle_target_mode":
+                                self.selected_tower.cycle_target_mode()
 
                             else:
                                 self.selected_tower_type = tower_type
@@ -518,7 +406,7 @@ class Game:
                         else:
                             # Handle unit selection, movement, and tower placement
                             x, y = mouse_pos
-                            if x < SCREEN_WIDTH - 200:  # Only allow placement in the game area
+                            if x < SCREEN_WIDTH - PANEL_WIDTH:  # Only allow placement in the game area
                                 grid_x = x // GRID_SIZE
                                 grid_y = y // GRID_SIZE
                                 
@@ -536,6 +424,8 @@ class Game:
                                                 self.selected_unit.is_selected = False
                                             tower.is_selected = True
                                             self.selected_unit = tower
+                                            # Giữ tháp trong panel chỉ số sau khi thả chuột
+                                            self.selected_tower = tower
                                             tower.start_drag(x, y)
                                             self.dragging_unit = tower
                                             clicked_on_unit = True
@@ -549,6 +439,7 @@ class Game:
                                                     self.selected_unit.is_selected = False
                                                 soldier.is_selected = True
                                                 self.selected_unit = soldier
+                                                self.selected_tower = None
                                                 soldier.start_drag(x, y)
                                                 self.dragging_unit = soldier
                                                 clicked_on_unit = True
@@ -556,6 +447,7 @@ class Game:
                                     
                                     if not clicked_on_unit:
                                         # Deselect current unit if clicking on empty space
+                                        self.selected_tower = None
                                         if self.selected_unit:
                                             self.selected_unit.is_selected = False
                                             self.selected_unit = None
@@ -567,7 +459,7 @@ class Game:
                 elif event.type == pygame.MOUSEBUTTONUP:
                     if event.button == 1 and self.dragging_unit:  # Left click release
                         x, y = pygame.mouse.get_pos()
-                        if x < SCREEN_WIDTH - 200:  # Only allow placement in the game area
+                        if x < SCREEN_WIDTH - PANEL_WIDTH:  # Only allow placement in the game area
                             grid_x = x // GRID_SIZE
                             grid_y = y // GRID_SIZE
                             
@@ -597,17 +489,19 @@ class Game:
                             self.selected_unit = None
                         # Also clear tower placement selection
                         self.selected_tower_type = None
+                        self.selected_tower = None
                         self.dragging_unit = None
             
-            # Update game state if not game over
-            if not self.game_over:
-                self.update()
+            # Update game state (fixed ticks for the time since the last frame)
+            self.advance(frame_ms)
             
             # Draw everything
             restart_button = self.draw()
+            self.present()
+            sound_bank.flush()
             
             # Cap the frame rate
-            self.clock.tick(FPS)
+            frame_ms = self.clock.tick(FPS)
         
         pygame.quit()
         sys.exit() 
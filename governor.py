@@ -0,0 +1,71 @@
+import logging
+from collections import deque
+from typing import Callable, Dict, List, Optional
+from constants import *
+
+logger = logging.getLogger(__name__)
+
+# Thời gian update + draw cho phép mỗi frame (ms)
+FRAME_BUDGET_MS = 1000 / TICK_RATE
+GOVERNOR_WINDOW = 120        # số frame gần nhất được xét
+GOVERNOR_PERCENTILE = 95
+GOVERNOR_MIN_SAMPLES = 60
+GOVERNOR_COOLDOWN_FRAMES = 120  # tối thiểu giữa hai lần đổi tier
+# Percentile dưới ngân sách * tỉ lệ này thì thử nâng chất lượng lên lại
+GOVERNOR_RECOVER_RATIO = 0.6
+
+# Tier 0 là chất lượng cao nhất; các hệ số nhân vào ngưỡng LOD và số voice mặc định
+QUALITY_TIERS: List[Dict] = [
+    {"name": "high", "max_explosions": 64, "rotation_steps": 72, "lod_scale": 1.0, "voice_scale": 1.0},
+    {"name": "medium", "max_explosions": 32, "rotation_steps": 36, "lod_scale": 0.75, "voice_scale": 0.75},
+    {"name": "low", "max_explosions": 16, "rotation_steps": 24, "lod_scale": 0.5, "voice_scale": 0.5},
+    {"name": "minimal", "max_explosions": 8, "rotation_steps": 12, "lod_scale": 0.25, "voice_scale": 0.25},
+]
+
+
+class FrameGovernor:
+    """
+    Watches per-frame update + draw time and steps QUALITY_TIERS down when the
+    rolling percentile goes over budget, and back up once there is headroom.
+    Mỗi lần đổi tier đều được ghi log kèm lý do.
+    """
+
+    def __init__(self, on_change: Optional[Callable[[Dict], None]] = None, tiers: List[Dict] = QUALITY_TIERS,
+                 budget_ms: float = FRAME_BUDGET_MS, window: int = GOVERNOR_WINDOW):
+        self.on_change = on_change
+        self.tiers = tiers
+        self.budget_ms = budget_ms
+        self.samples = deque(maxlen=window)
+        self.tier_index = 0
+        self.frames_since_change = 0
+
+    @property
+    def tier(self) -> Dict:
+        return self.tiers[self.tier_index]
+
+    def percentile(self) -> float:
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, len(ordered) * GOVERNOR_PERCENTILE // 100)]
+
+    def record(self, work_ms: float):
+        """Add one frame's update + draw time and change tier if the trend calls for it."""
+        self.samples.append(work_ms)
+        self.frames_since_change += 1
+        if len(self.samples) < GOVERNOR_MIN_SAMPLES or self.frames_since_change < GOVERNOR_COOLDOWN_FRAMES:
+            return
+
+        value = self.percentile()
+        if value > self.budget_ms and self.tier_index < len(self.tiers) - 1:
+            self.set_tier(self.tier_index + 1, f"p{GOVERNOR_PERCENTILE} {value:.1f} ms > budget {self.budget_ms:.1f} ms")
+        elif value < self.budget_ms * GOVERNOR_RECOVER_RATIO and self.tier_index > 0:
+            self.set_tier(self.tier_index - 1,
+                          f"p{GOVERNOR_PERCENTILE} {value:.1f} ms < {self.budget_ms * GOVERNOR_RECOVER_RATIO:.1f} ms")
+
+    def set_tier(self, index: int, reason: str = "manual"):
+        previous = self.tier
+        self.tier_index = index
+        self.samples.clear()
+        self.frames_since_change = 0
+        logger.info("Quality tier %s -> %s (%s)", previous["name"], self.tier["name"], reason)
+        if self.on_change:
+            self.on_change(self.tier)
@@ -0,0 +1,44 @@
+import pygame
+from typing import Dict, Tuple
+from constants import *
+from render_queue import RenderQueue, LAYER_HEALTH_BARS
+from lod import LOD_FEWER_BARS, LOD_BAR_HEALTH_RATIO
+
+HEALTH_BAR_HEIGHT = 5
+
+# (width, số pixel xanh) -> surface dựng sẵn; mỗi mức ứng với một pixel nên không sai lệch so với vẽ rect
+_bars: Dict[Tuple[int, int], pygame.Surface] = {}
+
+
+def _build_bar(width: int, filled: int) -> pygame.Surface:
+    bar = pygame.Surface((width, HEALTH_BAR_HEIGHT))
+    if pygame.display.get_surface() is not None:
+        bar = bar.convert()
+    bar.fill(RED)
+    if filled > 0:
+        bar.fill(GREEN, (0, 0, filled, HEALTH_BAR_HEIGHT))
+    return bar
+
+
+def get_bar(width: int, health: float, max_health: float) -> pygame.Surface:
+    """Bar sprite for the given health, quantized to whole pixels of fill."""
+    filled = max(0, min(width, int(health / max_health * width)))
+    key = (width, filled)
+    bar = _bars.get(key)
+    if bar is None:
+        bar = _build_bar(width, filled)
+        _bars[key] = bar
+    return bar
+
+
+def emit(queue: RenderQueue, x: float, y: float, width: int, offset: int, health: float, max_health: float):
+    """Queue a bar centred above (x, y) on the health-bar layer; entities at full health get no bar."""
+    if health >= max_health:
+        return
+    if queue.lod_level >= LOD_FEWER_BARS and health > max_health * LOD_BAR_HEALTH_RATIO:
+        return
+    queue.add(LAYER_HEALTH_BARS, get_bar(width, health, max_health), (int(x) - width // 2, int(y) - offset))
+
+
+def clear():
+    _bars.clear()
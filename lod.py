@@ -0,0 +1,105 @@
+from typing import Dict, List, Optional, Tuple
+from constants import *
+
+# Các mức chi tiết, mỗi mức giữ lại các cắt giảm của mức trước
+LOD_FULL = 0
+LOD_NO_ANIMATION = 1     # quái không chuyển frame animation
+LOD_COARSE_ROTATION = 2  # sprite quái chỉ xoay theo 8 hướng
+LOD_FEWER_BARS = 3       # chỉ hiện thanh máu của quái đã mất nhiều máu
+LOD_CLUSTERS = 4         # nhóm quái đông trong một ô vẽ thành một điểm đánh dấu
+MAX_LOD = LOD_CLUSTERS
+
+# Số entity đang sống để lên mức 1, 2, 3, 4
+LOD_ENTITY_THRESHOLDS = (250, 500, 900, 1600)
+# Chỉ hạ mức khi số entity xuống dưới ngưỡng * tỉ lệ này, tránh nhảy qua lại quanh ngưỡng
+LOD_HYSTERESIS = 0.8
+
+# Frame chậm hơn ngân sách này (ms, đã làm mượt) đủ lâu thì tăng thêm một mức
+LOD_FRAME_BUDGET_MS = 20.0
+LOD_RECOVER_RATIO = 0.6
+LOD_SWITCH_FRAMES = 30
+LOD_RECOVER_FRAMES = 120
+LOD_SMOOTHING = 0.1
+
+LOD_ROTATION_STEPS = 8
+# Ở LOD_FEWER_BARS chỉ vẽ thanh máu khi máu còn dưới tỉ lệ này
+LOD_BAR_HEALTH_RATIO = 0.5
+LOD_CLUSTER_MIN_SIZE = 4
+LOD_CLUSTER_COLOR = (255, 50, 50, 170)
+
+
+class LodPolicy:
+    """
+    Picks a detail level from the live entity count and the measured frame time.
+    Mức cuối cùng là mức cao hơn trong hai tiêu chí; cả hai đều có độ trễ để tự hạ lại khi tải giảm.
+    """
+
+    def __init__(self, entity_thresholds: Tuple[int, ...] = LOD_ENTITY_THRESHOLDS,
+                 frame_budget_ms: float = LOD_FRAME_BUDGET_MS):
+        self.entity_thresholds = entity_thresholds
+        self.frame_budget_ms = frame_budget_ms
+        self.level = LOD_FULL
+        self.count_level = LOD_FULL
+        self.time_level = LOD_FULL
+        self.frame_ms = 0.0
+        self.slow_frames = 0
+        self.fast_frames = 0
+
+    def update(self, entity_count: int, frame_ms: float) -> int:
+        """Feed one frame's measurements and return the level to draw it at."""
+        thresholds = self.entity_thresholds
+        while self.count_level < MAX_LOD and entity_count >= thresholds[self.count_level]:
+            self.count_level += 1
+        while self.count_level > LOD_FULL and entity_count < thresholds[self.count_level - 1] * LOD_HYSTERESIS:
+            self.count_level -= 1
+
+        self.frame_ms += (frame_ms - self.frame_ms) * LOD_SMOOTHING
+        if self.frame_ms > self.frame_budget_ms:
+            self.slow_frames += 1
+            self.fast_frames = 0
+        elif self.frame_ms < self.frame_budget_ms * LOD_RECOVER_RATIO:
+            self.fast_frames += 1
+            self.slow_frames = 0
+        else:
+            self.slow_frames = self.fast_frames = 0
+
+        if self.slow_frames >= LOD_SWITCH_FRAMES and self.time_level < MAX_LOD:
+            self.time_level += 1
+            self.slow_frames = 0
+        elif self.fast_frames >= LOD_RECOVER_FRAMES and self.time_level > LOD_FULL:
+            self.time_level -= 1
+            self.fast_frames = 0
+
+        self.level = max(self.count_level, self.time_level)
+        return self.level
+
+
+def rotation_steps(level: int) -> Optional[int]:
+    """Angle buckets for enemy sprites at this level (None = sprite_cache default)."""
+    return LOD_ROTATION_STEPS if level >= LOD_COARSE_ROTATION else None
+
+
+def cluster_enemies(enemies, cell_size: int = GRID_SIZE, min_size: int = LOD_CLUSTER_MIN_SIZE):
+    """
+    Split enemies into dense grid cells and the rest.
+    Returns ([(x, y, count), ...] centred on each dense cell's members, [loose enemies]).
+    """
+    cells: Dict[Tuple[int, int], List] = {}
+    for enemy in enemies:
+        key = (int(enemy.x) // cell_size, int(enemy.y) // cell_size)
+        members = cells.get(key)
+        if members is None:
+            cells[key] = [enemy]
+        else:
+            members.append(enemy)
+
+    clusters = []
+    loose = []
+    for members in cells.values():
+        if len(members) >= min_size:
+            count = len(members)
+            clusters.append((sum(enemy.x for enemy in members) / count,
+                             sum(enemy.y for enemy in members) / count, count))
+        else:
+            loose.extend(members)
+    return clusters, loose
@@ -1,5 +1,11 @@
+import logging
 import pygame
 import sys
+import constants
+
+# Screen-dependent constants must be initialised before the other game modules are imported
+constants.init_runtime()
+
 from constants import *
 from menu import Menu
 from maps import MAPS, DIFFICULTY_SETTINGS
@@ -8,21 +14,30 @@ from soldier import Soldier
 from welcome_screen import WelcomeScreen
 from map_selection import MapSelection
 from difficulty_selection import DifficultySelection
+from preloader import AssetPreloader
+from tower import preload_tower_assets
+import sound_bank
+import sprite_cache
 
 def main():
-    # Initialize Pygame
-    pygame.init()
-    pygame.font.init()
+    # Các lần đổi chất lượng của bộ điều tốc được ghi ra log
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s: %(message)s")
+
+    # Initialize Pygame (display and fonts are already up from constants.init_runtime)
     pygame.mixer.init()
 
     pygame.mixer.set_num_channels(64)
 
     # Create initial window
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), DISPLAY_FLAGS)
     pygame.display.set_caption("Tower Defense 8-bit")
+
+    # Decode every sprite and sound on worker threads while the menus are showing
+    preloader = AssetPreloader()
+    preloader.start()
     
     # Create welcome screen
-    welcome_screen = WelcomeScreen(screen)
+    welcome_screen = WelcomeScreen(screen, preloader)
     map_selection = None
     difficulty_selection = None
     
@@ -34,6 +49,8 @@ def main():
     
     # Main game loop
     running = True
+    clock = pygame.time.Clock()
+    frame_ms = 0
     while running:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -45,7 +62,7 @@ def main():
                         action = welcome_screen.handle_click(event.pos)
                         if action == "play":
                             current_screen = "map"
-                            map_selection = MapSelection(screen)
+                            map_selection = MapSelection(screen, preloader)
                         elif action == "quit":
                             running = False
                             
@@ -62,6 +79,11 @@ def main():
                         action, map_name, difficulty = difficulty_selection.handle_click(event.pos)
                         if action == "start":
                             current_screen = "game"
+                            preloader.finish()
+                            # Khung hình tháp đã có trong cache nên preload_tower_assets() chỉ đo bộ nhớ
+                            logging.getLogger(__name__).info("Tower sprites: %.1f MB, whole sprite cache: %.1f MB",
+                                                             preload_tower_assets() / (1024 * 1024),
+                                                             sprite_cache.memory_bytes() / (1024 * 1024))
                             current_game = Game(map_name, difficulty)
                         elif action == "back":
                             current_screen = "map"
@@ -95,6 +117,8 @@ def main():
                                     if current_game.gold >= upgrade_cost:
                                         current_game.gold -= upgrade_cost
                                         tower.upgrade()
+                                elif tower_type == "cycle_target_mode" and current_game.selected_tower:
+                                    current_game.selected_tower.cycle_target_mode()
 
                                 else:
                                     current_game.selected_tower_type = tower_type
@@ -102,7 +126,7 @@ def main():
                             else:
                                 # Handle unit selection and tower placement
                                 x, y = event.pos
-                                if x < SCREEN_WIDTH - 200:
+                                if x < SCREEN_WIDTH - PANEL_WIDTH:
                                     grid_x = x // GRID_SIZE
                                     grid_y = y // GRID_SIZE
                                     
@@ -158,7 +182,7 @@ def main():
             elif event.type == pygame.MOUSEBUTTONUP:
                 if current_screen == "game" and current_game and current_game.dragging_unit:
                     x, y = pygame.mouse.get_pos()
-                    if x < SCREEN_WIDTH - 200:
+                    if x < SCREEN_WIDTH - PANEL_WIDTH:
                         grid_x = x // GRID_SIZE
                         grid_y = y // GRID_SIZE
                         
@@ -198,6 +222,10 @@ def main():
                     else:
                         running = False
         
+        # Hand finished background loads to the caches
+        if not preloader.finished:
+            preloader.pump()
+
         # Update and draw
         if current_screen == "welcome":
             welcome_screen.draw()
@@ -206,15 +234,20 @@ def main():
         elif current_screen == "difficulty":
             difficulty_selection.draw()
         elif current_screen == "game":
-            if not current_game.game_over:
-                current_game.update()
+            current_game.advance(frame_ms)
             current_game.draw()
         
-        # Update display
-        pygame.display.flip()
+        # Play the sounds queued this frame
+        sound_bank.flush()
+
+        # Update display (the game screen only pushes the parts that changed)
+        if current_screen == "game" and current_game:
+            current_game.present()
+        else:
+            pygame.display.flip()
         
-        # Cap the frame rate
-        pygame.time.Clock().tick(FPS)
+        # Cap the frame rate; the elapsed time drives the next frame's simulation ticks
+        frame_ms = clock.tick(FPS)
     
     pygame.quit()
     sys.exit()
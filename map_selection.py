@@ -1,20 +1,20 @@
 import pygame
 from typing import Optional
 from constants import *
+import sound_bank
+from preloader import draw_progress_bar
 from maps import MAPS
 
 class MapSelection:
-    def __init__(self, screen):
+    def __init__(self, screen, preloader=None):
         self.screen = screen
+        self.preloader = preloader
         self.button_height = int(SCREEN_HEIGHT * 0.08)  # Dynamic button height
         self.button_width = int(SCREEN_WIDTH * 0.3)  # Dynamic button width
         self.button_margin = int(SCREEN_HEIGHT * 0.02)  # Dynamic margin
         self.buttons = {}
         self.selected_map = "Forest"
         self.create_buttons()
-
-        self.click_sound = pygame.mixer.Sound("assets/sounds/Menu Selection Click.wav")
-        self.click_sound.set_volume(0.3)
         
     def create_buttons(self):
         # Title position
@@ -84,6 +84,10 @@ class MapSelection:
         desc_text = GAME_FONT.render(desc, True, WHITE)
         desc_rect = desc_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 50))
         self.screen.blit(desc_text, desc_rect)
+
+        # Draw asset loading progress
+        if self.preloader and not self.preloader.finished:
+            draw_progress_bar(self.screen, self.preloader.progress)
     
     def draw_button(self, text, button_id, enabled, is_selected):
         button = self.buttons[button_id]
@@ -100,12 +104,12 @@ class MapSelection:
             if button.collidepoint(pos):
                 if button_id.startswith("map_"):
                     self.selected_map = button_id[4:]
-                    self.click_sound.play()
+                    sound_bank.play("click")
                     return None, None
                 elif button_id == "next":
-                    self.click_sound.play()
+                    sound_bank.play("click")
                     return "next", self.selected_map
                 elif button_id == "back":
-                    self.click_sound.play()
+                    sound_bank.play("click")
                     return "back", None
         return None, None 
@@ -87,6 +87,10 @@ def get_map_description(map_name: str) -> str:
         raise ValueError(f"Map '{map_name}' not found")
     return MAPS[map_name]["description"]
 
+def get_map_image_path(map_name: str) -> str:
+    """Get the background image path for a specific map."""
+    return f"assets/map/{map_name.lower().replace(' ', '_')}.png"
+
 def get_difficulty_settings(difficulty: str) -> Dict:
     """Get the settings for a specific difficulty level."""
     if difficulty not in DIFFICULTY_SETTINGS:
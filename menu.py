@@ -1,6 +1,8 @@
 import pygame
 from typing import Tuple, Optional
 from constants import *
+import sound_bank
+from text_cache import render_text, draw_counter
 from maps import MAPS, DIFFICULTY_SETTINGS
 
 class Menu:
@@ -14,9 +16,11 @@ class Menu:
         self.selected_tower = None
         self.sound_enabled = True
         self.music_enabled = True
-        self.click_sound = pygame.mixer.Sound("assets/sounds/Menu Selection Click.wav")
-        self.click_sound.set_volume(0.3)
         self.auto_wave = False
+        # Panel bên phải dựng sẵn, chỉ vẽ lại khi get_panel_state() đổi
+        self.panel_left = SCREEN_WIDTH - PANEL_WIDTH
+        self.panel: Optional[pygame.Surface] = None
+        self.panel_state = None
 
     def create_buttons(self):
         # Tower buttons
@@ -52,6 +56,14 @@ class Menu:
         self.buttons["toggle_sound"] = pygame.Rect(SCREEN_WIDTH - self.button_width - 30,bottom_y + 2*self.button_height + 2*self.button_margin, self.button_width,self.button_height)
         self.buttons["toggle_music"] = pygame.Rect(SCREEN_WIDTH - self.button_width - 30, bottom_y + 3*self.button_height + 3*self.button_margin, self.button_width,self.button_height)
         self.buttons["auto_wave"] = pygame.Rect(SCREEN_WIDTH - self.button_width - 30,bottom_y + 4 * self.button_height + 4 * self.button_margin,self.button_width, self.button_height)
+
+        # Nút đổi cách chọn mục tiêu: bên trái các dòng chỉ số của tháp đang chọn; màn hình thấp
+        # (720/768) thì chỗ đó trùng cột nút điều khiển nên dời lên ô trống cạnh nút Rapid
+        controls = [self.buttons[name] for name in ("start_wave", "quit", "toggle_sound", "toggle_music", "auto_wave")]
+        target_mode = pygame.Rect(SCREEN_WIDTH - 190, self.buttons["upgrade"].bottom + 10, 65, self.button_height)
+        if target_mode.collidelist(controls) != -1:
+            target_mode.topleft = (self.buttons["slow_tower"].x, self.buttons["rapid_tower"].y)
+        self.buttons["target_mode"] = target_mode
         # Map selection buttons
         y += self.button_height + self.button_margin * 2
         for map_name in MAPS.keys():
@@ -64,38 +76,54 @@ class Menu:
             self.buttons[f"diff_{difficulty}"] = pygame.Rect(SCREEN_WIDTH - self.button_width - 10, y, self.button_width, self.button_height)
             y += self.button_height + self.button_margin
     
+    def get_panel_state(self, gold, wave, lives, dragging_enabled, can_sell=False):
+        # Mọi giá trị ảnh hưởng tới panel; vàng hiện bằng số nên đã bao gồm cả ngưỡng đủ tiền mua tháp
+        tower = self.selected_tower if can_sell else None
+        tower_stats = (tower.level, tower.damage, tower.range, tower.fire_rate, tower.target_mode) if tower else None
+        return (gold, wave, lives, dragging_enabled, can_sell, tower_stats, self.selected_button,
+                self.sound_enabled, self.music_enabled, self.auto_wave)
+
     def draw(self, screen, gold, wave, lives, dragging_enabled, can_sell=False):
+        # Panel chỉ được vẽ lại khi có giá trị thay đổi, còn lại chỉ blit bản đã dựng
+        state = self.get_panel_state(gold, wave, lives, dragging_enabled, can_sell)
+        if self.panel is None or state != self.panel_state:
+            self.panel_state = state
+            self.render_panel(gold, wave, lives, dragging_enabled, can_sell)
+        screen.blit(self.panel, (self.panel_left, 0))
+
+    def render_panel(self, gold, wave, lives, dragging_enabled, can_sell=False):
+        if self.panel is None:
+            self.panel = pygame.Surface((PANEL_WIDTH, SCREEN_HEIGHT)).convert()
+        panel = self.panel
+        left = self.panel_left
+
         # Draw background
-        pygame.draw.rect(screen, (50, 50, 50), (SCREEN_WIDTH - 200, 0, 200, SCREEN_HEIGHT))
+        panel.fill((50, 50, 50))
         
         # Draw game info
-        gold_text = GAME_FONT.render(f"Gold: {gold}", True, WHITE)
-        wave_text = GAME_FONT.render(f"Wave: {wave}", True, WHITE)
-        lives_text = GAME_FONT.render(f"Lives: {lives}", True, WHITE)
-        
-        screen.blit(gold_text, (SCREEN_WIDTH - 190, 10))
-        screen.blit(wave_text, (SCREEN_WIDTH - 190, 35))
-        screen.blit(lives_text, (SCREEN_WIDTH - 190, 60))
+        draw_counter(panel, GAME_FONT, "Gold: ", gold, WHITE, (SCREEN_WIDTH - 190 - left, 10))
+        draw_counter(panel, GAME_FONT, "Wave: ", wave, WHITE, (SCREEN_WIDTH - 190 - left, 35))
+        draw_counter(panel, GAME_FONT, "Lives: ", lives, WHITE, (SCREEN_WIDTH - 190 - left, 60))
         
         # Draw tower buttons
-        self.draw_button(screen, "Basic (50g)", "basic_tower", gold >= 50)
-        self.draw_button(screen, "Rapid (75g)", "rapid_tower", gold >= 75)
-        self.draw_button(screen, "Sniper (100g)", "sniper_tower", gold >= 100)
-        self.draw_button(screen, "Laser (120g)", "laser_tower", gold >= 120)
-        self.draw_button(screen, "Slow (90g)", "slow_tower", gold >= 90)
+        self.draw_button(panel, "Basic (50g)", "basic_tower", gold >= 50)
+        self.draw_button(panel, "Rapid (75g)", "rapid_tower", gold >= 75)
+        self.draw_button(panel, "Sniper (100g)", "sniper_tower", gold >= 100)
+        self.draw_button(panel, "Laser (120g)", "laser_tower", gold >= 120)
+        self.draw_button(panel, "Slow (90g)", "slow_tower", gold >= 90)
 
-        self.draw_button(screen, "Soldier (75g)", "soldier", gold >= 75)
+        self.draw_button(panel, "Soldier (75g)", "soldier", gold >= 75)
         #draw dragging button
-        self.draw_button(screen, "Drag: " + ("ON" if dragging_enabled else "OFF"), "toggle_drag", True)
+        self.draw_button(panel, "Drag: " + ("ON" if dragging_enabled else "OFF"), "toggle_drag", True)
         #draw sell button
-        self.draw_button(screen,"Sell Tower","sell",can_sell)
+        self.draw_button(panel,"Sell Tower","sell",can_sell)
         #draw upgrade button
-        self.draw_button(screen, "Upgrade", "upgrade", can_sell)
+        self.draw_button(panel, "Upgrade", "upgrade", can_sell)
         #draw music control buttion
-        self.draw_button(screen, "Sound: " + ("ON" if self.sound_enabled else "OFF"), "toggle_sound", True)
-        self.draw_button(screen, "Music: " + ("ON" if self.music_enabled else "OFF"), "toggle_music", True)
+        self.draw_button(panel, "Sound: " + ("ON" if self.sound_enabled else "OFF"), "toggle_sound", True)
+        self.draw_button(panel, "Music: " + ("ON" if self.music_enabled else "OFF"), "toggle_music", True)
 
-        self.draw_button(screen, "Auto Wave: " + ("ON" if self.auto_wave else "OFF"), "auto_wave", True)
+        self.draw_button(panel, "Auto Wave: " + ("ON" if self.auto_wave else "OFF"), "auto_wave", True)
 
         if can_sell:
             tower = self.selected_tower  # gán để dễ viết
@@ -107,24 +135,26 @@ class Menu:
             ]
             start_y = self.buttons["upgrade"].bottom + 10
             for i, line in enumerate(stats):
-                stat_text = INFO_FONT.render(line, True, WHITE)
-                screen.blit(stat_text, (SCREEN_WIDTH - self.button_width, start_y + i * 20))
+                stat_text = render_text(INFO_FONT, line, WHITE)
+                panel.blit(stat_text, (SCREEN_WIDTH - self.button_width - left, start_y + i * 20))
+            self.draw_button(panel, tower.target_mode.capitalize(), "target_mode", True)
 
         # Draw game control buttons
-        self.draw_button(screen, "Start Wave", "start_wave", True)
-        self.draw_button(screen, "Quit", "quit", True)
+        self.draw_button(panel, "Start Wave", "start_wave", True)
+        self.draw_button(panel, "Quit", "quit", True)
         
     
-    def draw_button(self, screen, text, button_id, enabled):
-        button = self.buttons[button_id]
+    def draw_button(self, panel, text, button_id, enabled):
+        # Nút lưu theo toạ độ màn hình, panel bắt đầu từ panel_left
+        button = self.buttons[button_id].move(-self.panel_left, 0)
         is_selected = (self.selected_button == button_id)
         color = (150, 150, 150) if is_selected else (100, 100, 100) if enabled else (50, 50, 50)
-        pygame.draw.rect(screen, color, button)
-        pygame.draw.rect(screen, BLACK, button, 2)
+        pygame.draw.rect(panel, color, button)
+        pygame.draw.rect(panel, BLACK, button, 2)
         
-        text_surface = INFO_FONT.render(text, True, WHITE if enabled else (100, 100, 100))
+        text_surface = render_text(INFO_FONT, text, WHITE if enabled else (100, 100, 100))
         text_rect = text_surface.get_rect(center=button.center)
-        screen.blit(text_surface, text_rect)
+        panel.blit(text_surface, text_rect)
     
     def handle_click(self, pos, gold):
         for button_id, button in self.buttons.items():
@@ -132,63 +162,67 @@ class Menu:
                 if button_id == "basic_tower" and gold >= 50:
                     self.selected_button = "basic_tower"
                     if self.sound_enabled:
-                        self.click_sound.play()
+                        sound_bank.play("click")
                     return "basic_tower", 50
                 elif button_id == "rapid_tower" and gold >= 75:
                     self.selected_button = "rapid_tower"
                     if self.sound_enabled:
-                        self.click_sound.play()
+                        sound_bank.play("click")
                     return "rapid_tower", 75
                 elif button_id == "sniper_tower" and gold >= 100:
                     self.selected_button = "sniper_tower"
                     if self.sound_enabled:
-                        self.click_sound.play()
+                        sound_bank.play("click")
                     return "sniper_tower", 100
                 elif button_id == "soldier" and gold >= 75:
                     self.selected_button = "soldier"
                     if self.sound_enabled:
-                        self.click_sound.play()
+                        sound_bank.play("click")
                     return "soldier", 75
                 elif button_id == "laser_tower" and gold >= 120:
                     self.selected_button = "laser_tower"
                     if self.sound_enabled:
-                        self.click_sound.play()
+                        sound_bank.play("click")
                     return "laser_tower", 120
                 elif button_id == "slow_tower" and gold >= 90:
                     self.selected_button = "slow_tower"
                     if self.sound_enabled:
-                        self.click_sound.play()
+                        sound_bank.play("click")
                     return "slow_tower", 90
                 elif button_id == "auto_wave":
                     self.auto_wave = not self.auto_wave
                     if self.sound_enabled:
-                        self.click_sound.play()
+                        sound_bank.play("click")
                     return "toggle_auto_wave", 0
 
 
                 elif button_id == "toggle_drag":
                     self.selected_button = None
                     if self.sound_enabled:
-                        self.click_sound.play()
+                        sound_bank.play("click")
                     return "toggle_drag", 0
                 elif button_id == "sell":
                     self.selected_button = None
                     if self.sound_enabled:
-                        self.click_sound.play()
+                        sound_bank.play("click")
                     return "sell", 0
+                elif button_id == "target_mode" and self.selected_tower:
+                    if self.sound_enabled:
+                        sound_bank.play("click")
+                    return "cycle_target_mode", 0
                 elif button_id == "upgrade":
                     self.selected_button = None
                     if self.sound_enabled:
-                        self.click_sound.play()
+                        sound_bank.play("click")
                     return "upgrade", 0
                 elif button_id == "toggle_sound":
                     self.sound_enabled = not self.sound_enabled
                     if self.sound_enabled:
-                        self.click_sound.play()
+                        sound_bank.play("click")
                     return "toggle_sound", 0
                 elif button_id == "toggle_music":
                     if self.sound_enabled:
-                        self.click_sound.play()
+                        sound_bank.play("click")
                     self.music_enabled = not self.music_enabled
                     if self.music_enabled:
                         pygame.mixer.music.play(-1)
@@ -199,19 +233,19 @@ class Menu:
                 elif button_id == "start_wave":
                     self.selected_button = None
                     if self.sound_enabled:
-                        self.click_sound.play()
+                        sound_bank.play("click")
                     return "start_wave", 0
                 elif button_id == "quit":
                     self.selected_button = None
                     if self.sound_enabled:
-                        self.click_sound.play()
+                        sound_bank.play("click")
                     return "quit", 0
                 elif button_id.startswith("map_"):
                     if self.sound_enabled:
-                        self.click_sound.play()
+                        sound_bank.play("click")
                     return f"select_map_{button_id[4:]}", 0
                 elif button_id.startswith("diff_"):
                     if self.sound_enabled:
-                        self.click_sound.play()
+                        sound_bank.play("click")
                     return f"select_difficulty_{button_id[5:]}", 0
         return None, 0 
@@ -0,0 +1,31 @@
+import pygame
+from typing import Dict, Tuple
+
+# Surface bán trong suốt dựng sẵn, key = (kind, kích thước, màu, width)
+_overlays: Dict[tuple, pygame.Surface] = {}
+
+
+def get_circle(radius: int, color: Tuple[int, int, int, int], width: int = 0) -> pygame.Surface:
+    """Translucent circle of the given radius on a (2r, 2r) surface, built once per key."""
+    key = ("circle", radius, tuple(color), width)
+    surface = _overlays.get(key)
+    if surface is None:
+        surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        pygame.draw.circle(surface, color, (radius, radius), radius, width=width)
+        _overlays[key] = surface
+    return surface
+
+
+def get_rect(size: Tuple[int, int], color: Tuple[int, int, int, int]) -> pygame.Surface:
+    """Translucent filled rectangle of the given size, built once per key."""
+    key = ("rect", tuple(size), tuple(color), 0)
+    surface = _overlays.get(key)
+    if surface is None:
+        surface = pygame.Surface(size, pygame.SRCALPHA)
+        surface.fill(color)
+        _overlays[key] = surface
+    return surface
+
+
+def clear():
+    _overlays.clear()
@@ -0,0 +1,113 @@
+import math
+import numpy as np
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Tuple
+from constants import *
+
+# Cách chọn mục tiêu của tháp; nút trong panel chỉ số quay vòng theo thứ tự này
+TARGET_MODES = ("nearest", "first", "last", "strongest")
+
+
+# Nới mỗi khoảng progress một chút để sai số làm tròn không loại quái nằm đúng mép tầm bắn
+PROGRESS_EPSILON = 1e-6
+
+
+def _segment_span(px: float, py: float, ax: float, ay: float, bx: float, by: float,
+                  radius: float) -> Optional[Tuple[float, float]]:
+    """Fractions [t0, t1] of the segment a-b that lie within radius of (px, py), or None."""
+    dx = bx - ax
+    dy = by - ay
+    fx = ax - px
+    fy = ay - py
+    c = fx * fx + fy * fy - radius * radius
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0:
+        return (0.0, 1.0) if c <= 0 else None
+    b = fx * dx + fy * dy
+    disc = b * b - length_sq * c
+    if disc < 0:
+        return None
+    root = math.sqrt(disc)
+    t0 = max(0.0, (-b - root) / length_sq)
+    t1 = min(1.0, (-b + root) / length_sq)
+    if t0 > t1:
+        return None
+    if length_sq != GRID_SIZE * GRID_SIZE:
+        # Progress chỉ tuyến tính theo vị trí trên đoạn dài đúng một ô; đoạn khác lấy trọn
+        return 0.0, 1.0
+    return t0, t1
+
+
+def path_intervals(path: List[Tuple[int, int]], x: float, y: float, radius: float) -> List[Tuple[float, float]]:
+    """
+    Progress ranges [low, high] of the path that pass within radius of (x, y), in ascending order.
+    Đoạn i nối tâm ô i với tâm ô i + 1, ứng với progress từ i đến i + 1; mỗi khoảng chỉ gồm
+    phần đoạn nằm trong vòng tròn, nên quái trong khoảng gần như chắc chắn trong tầm.
+    """
+    intervals: List[Tuple[float, float]] = []
+    half = GRID_SIZE // 2
+    for index in range(len(path) - 1):
+        (ax, ay), (bx, by) = path[index], path[index + 1]
+        span = _segment_span(x, y, ax * GRID_SIZE + half, ay * GRID_SIZE + half,
+                             bx * GRID_SIZE + half, by * GRID_SIZE + half, radius)
+        if span is None:
+            continue
+        low = index + span[0] - PROGRESS_EPSILON
+        high = index + span[1] + PROGRESS_EPSILON
+        if intervals and intervals[-1][1] >= low:
+            intervals[-1] = (intervals[-1][0], max(intervals[-1][1], high))
+        else:
+            intervals.append((low, high))
+    return intervals
+
+
+class PathProgressIndex:
+    """
+    Live enemies ordered by how far along the path they are, re-sorted once per tick.
+    Thứ tự gần như không đổi giữa hai tick nên sort (Timsort) gần như tuyến tính;
+    mỗi truy vấn first/last chỉ cần bisect vào đoạn path nằm trong tầm tháp.
+    """
+
+    def __init__(self):
+        self.enemies: List = []
+        self.progress: List[float] = []
+
+    def rebuild_from_store(self, store):
+        """Sort every live enemy of an EnemyStore by progress, ties in spawn order, straight from its arrays."""
+        slots = np.flatnonzero(store.active)
+        progress = store.arrays["progress"][slots]
+        order = np.lexsort((store.spawn_seq[slots], progress))
+        entities = store.entities
+        self.enemies = [entities[slot] for slot in slots[order].tolist()]
+        self.progress = progress[order].tolist()
+
+    def first_in(self, intervals: List[Tuple[float, float]], x: float, y: float, radius: float) -> Optional[object]:
+        """Living enemy furthest along the path within radius of (x, y), or None."""
+        radius_sq = radius * radius
+        progress = self.progress
+        for low, high in reversed(intervals):
+            index = bisect_right(progress, high) - 1
+            while index >= 0 and progress[index] >= low:
+                enemy = self.enemies[index]
+                dx = enemy.x - x
+                dy = enemy.y - y
+                if enemy.health > 0 and dx * dx + dy * dy <= radius_sq:
+                    return enemy
+                index -= 1
+        return None
+
+    def last_in(self, intervals: List[Tuple[float, float]], x: float, y: float, radius: float) -> Optional[object]:
+        """Living enemy least far along the path within radius of (x, y), or None."""
+        radius_sq = radius * radius
+        progress = self.progress
+        count = len(progress)
+        for low, high in intervals:
+            index = bisect_left(progress, low)
+            while index < count and progress[index] <= high:
+                enemy = self.enemies[index]
+                dx = enemy.x - x
+                dy = enemy.y - y
+                if enemy.health > 0 and dx * dx + dy * dy <= radius_sq:
+                    return enemy
+                index += 1
+        return None
@@ -0,0 +1,126 @@
+import os
+import time
+import pygame
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+from constants import *
+import sound_bank
+import sprite_cache
+from enemy import ENEMY_SPRITE_SHEETS
+from explosion import EXPLOSION_FRAMES
+from maps import MAPS, get_map_image_path
+from soldier import SOLDIER_IMAGE, soldier_image_size
+from tower import TOWER_SPRITE_SHEETS, TOWER_FRAME_SIZE, TOWER_SCALE_FACTOR, LASER_TOWER_IMAGE, LASER_SCALE_FACTOR
+
+
+def _decode_sound(sound_id: str):
+    path, _ = sound_bank.SOUNDS[sound_id]
+    return pygame.mixer.Sound(path)
+
+
+class AssetPreloader:
+    """
+    Decode and scale every game asset on worker threads while the menus are showing.
+    Worker chỉ decode/scale; pump() chạy trên main thread để convert và đưa vào cache.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.jobs = self.build_jobs()
+        self.total = len(self.jobs)
+        self.installed = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: List = []
+
+    def build_jobs(self):
+        # Mỗi job: (loại, id, hàm chạy trên worker, tham số)
+        jobs = []
+        for path, frame_width, frame_height, row, num_cols, scale_width in ENEMY_SPRITE_SHEETS.values():
+            scale_height = int(scale_width * frame_height / frame_width)
+            jobs.append(("image", path, sprite_cache.prepare_row_frames,
+                         (path, frame_width, frame_height, row, num_cols, scale_width, scale_height)))
+
+        tower_size = int(GRID_SIZE * TOWER_SCALE_FACTOR)
+        for path, num_frames in TOWER_SPRITE_SHEETS.values():
+            jobs.append(("image", path, sprite_cache.prepare_row_frames,
+                         (path, TOWER_FRAME_SIZE, TOWER_FRAME_SIZE, 0, num_frames, tower_size, tower_size)))
+        laser_size = int(TOWER_FRAME_SIZE * LASER_SCALE_FACTOR)
+        jobs.append(("image", LASER_TOWER_IMAGE, sprite_cache.prepare_scaled_image,
+                     (LASER_TOWER_IMAGE, (laser_size, laser_size))))
+
+        jobs.append(("image", EXPLOSION_FRAMES[0], sprite_cache.prepare_row_frames, EXPLOSION_FRAMES))
+        jobs.append(("image", SOLDIER_IMAGE, sprite_cache.prepare_scaled_image, (SOLDIER_IMAGE, soldier_image_size())))
+
+        for map_name in MAPS:
+            path = get_map_image_path(map_name)
+            jobs.append(("image", path, sprite_cache.prepare_scaled_image,
+                         (path, (SCREEN_WIDTH - PANEL_WIDTH, SCREEN_HEIGHT))))
+
+        if pygame.mixer.get_init():
+            for sound_id in sound_bank.SOUNDS:
+                jobs.append(("sound", sound_id, _decode_sound, (sound_id,)))
+        return jobs
+
+    def start(self):
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="preload")
+        self._pending = [(kind, name, self._executor.submit(func, *args)) for kind, name, func, args in self.jobs]
+
+    @property
+    def progress(self) -> float:
+        return self.installed / self.total if self.total else 1.0
+
+    @property
+    def finished(self) -> bool:
+        return self.installed >= self.total
+
+    def _install(self, kind: str, name: str, future):
+        try:
+            result = future.result()
+        except (OSError, pygame.error) as e:
+            print(f"Không thể tải trước {name}: {e}")
+        else:
+            if kind == "sound":
+                sound_bank.install(name, result)
+            else:
+                sprite_cache.install(result)
+        self.installed += 1
+
+    def pump(self, time_budget_ms: float = 4.0) -> float:
+        """Hand finished assets to the caches for up to time_budget_ms; returns progress (0..1)."""
+        deadline = time.perf_counter() + time_budget_ms / 1000
+        still_pending = []
+        for index, (kind, name, future) in enumerate(self._pending):
+            if time.perf_counter() >= deadline:
+                still_pending.extend(self._pending[index:])
+                break
+            if future.done():
+                self._install(kind, name, future)
+            else:
+                still_pending.append((kind, name, future))
+        self._pending = still_pending
+        if self.finished:
+            self.shutdown()
+        return self.progress
+
+    def finish(self):
+        """Block until every asset is installed (used when a game starts before preloading is done)."""
+        for kind, name, future in self._pending:
+            self._install(kind, name, future)
+        self._pending = []
+        self.shutdown()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+def draw_progress_bar(screen: pygame.Surface, progress: float):
+    """Thin loading bar along the bottom of the screen."""
+    bar_width = int(SCREEN_WIDTH * 0.4)
+    bar_height = 8
+    x = SCREEN_WIDTH // 2 - bar_width // 2
+    y = SCREEN_HEIGHT - 30
+    pygame.draw.rect(screen, GRAY, (x, y, bar_width, bar_height))
+    pygame.draw.rect(screen, WHITE, (x, y, int(bar_width * progress), bar_height))
+    pygame.draw.rect(screen, BLACK, (x, y, bar_width, bar_height), 1)
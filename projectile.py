@@ -1,10 +1,16 @@
 import math
 import pygame
+import sound_bank
+import overlays
+from render_queue import RenderQueue, LAYER_PROJECTILES
 
 class Projectile:
     def __init__(self, x: int, y: int, target, damage: int, speed: int, color: tuple,game=None):
         self.x = x
         self.y = y
+        # Vị trí ở tick trước, dùng để nội suy khi vẽ
+        self.prev_x = x
+        self.prev_y = y
         self.target = target
         self.damage = damage
         self.speed = speed
@@ -14,6 +20,8 @@ class Projectile:
         self.game = game
 
     def move(self) -> bool:
+        self.prev_x = self.x
+        self.prev_y = self.y
         if self.target.health <= 0:
             return True  # Target is dead, remove projectile
         
@@ -25,17 +33,11 @@ class Projectile:
         if distance < self.radius + self.target.radius:
             # Nếu đạn có aoe_radius và game thì gây sát thương lan
             if hasattr(self, "aoe_radius") and hasattr(self, "game"):
-                for enemy in self.game.enemies:
-                    dx = enemy.x - self.target.x
-                    dy = enemy.y - self.target.y
-                    if math.sqrt(dx ** 2 + dy ** 2) <= self.aoe_radius:
-                        enemy.take_damage(self.damage)
+                for enemy in self.game.enemy_grid.query_circle(self.target.x, self.target.y, self.aoe_radius):
+                    enemy.take_damage(self.damage)
 
                 if hasattr(self, "game") and self.game.sound_enabled:
-                    for tower in self.game.towers:
-                        if type(tower).__name__ == "SniperTower":
-                            tower.explosion_sound.play()
-                            break
+                    sound_bank.play("explosion")
             else:
                 self.target.take_damage(self.damage)
             if self.game:
@@ -52,8 +54,17 @@ class Projectile:
         
         return False  # Keep moving
     
-    def draw(self, screen: pygame.Surface):
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.radius)
+    def get_dirty_rect(self) -> pygame.Rect:
+        # Gồm cả vị trí tick trước vì đạn được vẽ ở vị trí nội suy
+        rect = pygame.Rect(int(self.x) - self.radius - 1, int(self.y) - self.radius - 1,
+                           self.radius * 2 + 2, self.radius * 2 + 2)
+        return rect.union(rect.move(int(self.prev_x) - int(self.x), int(self.prev_y) - int(self.y)))
+
+    def emit(self, queue: RenderQueue):
+        # Hình tròn dựng sẵn một lần cho mỗi (bán kính, màu)
+        sprite = overlays.get_circle(self.radius, self.color)
+        x, y = queue.position(self)
+        queue.add(LAYER_PROJECTILES, sprite, (int(x) - self.radius, int(y) - self.radius))
 
 class SlowProjectile(Projectile):
     def __init__(self, x, y, target, damage, speed, color, slow_factor=0.5, slow_duration=90, game=None):
@@ -62,6 +73,8 @@ class SlowProjectile(Projectile):
         self.slow_duration = slow_duration
 
     def move(self) -> bool:
+        self.prev_x = self.x
+        self.prev_y = self.y
         if self.target.health <= 0:
             return True
 
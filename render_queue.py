@@ -0,0 +1,72 @@
+import pygame
+from typing import Callable, List, Tuple
+
+# Thứ tự vẽ các lớp, lớp nhỏ vẽ trước
+LAYER_UNDERLAY = 0      # vòng tầm bắn, vòng chọn lính
+LAYER_TOWERS = 1        # sprite tháp; primitive: ô chọn, tia laser
+LAYER_SOLDIERS = 2
+LAYER_ENEMIES = 3
+LAYER_EXPLOSIONS = 4
+LAYER_PROJECTILES = 5
+LAYER_HEALTH_BARS = 6
+NUM_LAYERS = 7
+
+
+def _texture_key(item: Tuple[pygame.Surface, Tuple[int, int]]) -> int:
+    return id(item[0])
+
+
+class RenderQueue:
+    """
+    Collects (surface, position) records from every world entity, then submits
+    them with one screen.blits() per layer, grouped by texture.
+    Primitive (pygame.draw) callbacks of a layer run right after its sprites.
+    """
+
+    def __init__(self, num_layers: int = NUM_LAYERS):
+        self.sprites: List[List[Tuple[pygame.Surface, Tuple[int, int]]]] = [[] for _ in range(num_layers)]
+        self.primitives: List[List[Tuple[Callable, tuple]]] = [[] for _ in range(num_layers)]
+        # Vị trí giữa tick trước (0.0) và tick mới nhất (1.0), do sim clock đặt trước mỗi lần vẽ
+        self.alpha = 1.0
+        # Mức chi tiết của frame đang vẽ (xem lod.py)
+        self.lod_level = 0
+
+    def position(self, entity) -> Tuple[float, float]:
+        """Entity position interpolated between its last two simulation ticks (prev_x/prev_y -> x/y)."""
+        alpha = self.alpha
+        return (entity.prev_x + (entity.x - entity.prev_x) * alpha,
+                entity.prev_y + (entity.y - entity.prev_y) * alpha)
+
+    def add(self, layer: int, surface: pygame.Surface, pos: Tuple[int, int]):
+        self.sprites[layer].append((surface, pos))
+
+    def add_centered(self, layer: int, surface: pygame.Surface, x: float, y: float):
+        """Queue surface centred on (x, y)."""
+        width, height = surface.get_size()
+        self.sprites[layer].append((surface, (int(x) - width // 2, int(y) - height // 2)))
+
+    def add_primitive(self, layer: int, func: Callable, *args):
+        """Queue func(screen, *args), e.g. pygame.draw.circle with its arguments."""
+        self.primitives[layer].append((func, args))
+
+    def __len__(self):
+        return sum(len(sprites) for sprites in self.sprites)
+
+    def flush(self, screen: pygame.Surface):
+        """Draw every layer in order and empty the queue."""
+        for sprites, primitives in zip(self.sprites, self.primitives):
+            if sprites:
+                # Gom các blit cùng texture cạnh nhau; sort ổn định nên thứ tự trong cùng texture giữ nguyên
+                sprites.sort(key=_texture_key)
+                screen.blits(sprites, doreturn=False)
+                sprites.clear()
+            if primitives:
+                for func, args in primitives:
+                    func(screen, *args)
+                primitives.clear()
+
+    def clear(self):
+        for sprites in self.sprites:
+            sprites.clear()
+        for primitives in self.primitives:
+            primitives.clear()
@@ -0,0 +1,33 @@
+from constants import *
+
+
+class FixedStepClock:
+    """
+    Turns variable frame times into a whole number of fixed simulation ticks.
+    Phần thời gian dư được giữ lại cho frame sau; alpha cho biết frame đang nằm
+    ở đâu giữa tick trước và tick hiện tại để nội suy khi vẽ.
+    """
+
+    def __init__(self, tick_rate: int = TICK_RATE, max_ticks_per_frame: int = MAX_TICKS_PER_FRAME):
+        self.tick_ms = 1000.0 / tick_rate
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.accumulator = 0.0
+
+    def reset(self):
+        self.accumulator = 0.0
+
+    def advance(self, dt_ms: float) -> int:
+        """Add dt_ms of real time and return how many ticks should run now."""
+        self.accumulator += dt_ms
+        ticks = int(self.accumulator // self.tick_ms)
+        if ticks > self.max_ticks_per_frame:
+            # Frame quá chậm: bỏ phần thời gian dư thay vì chạy đuổi mãi (game chậm lại thay vì đứng hình)
+            ticks = self.max_ticks_per_frame
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= ticks * self.tick_ms
+        return ticks
+
+    @property
+    def alpha(self) -> float:
+        return min(1.0, self.accumulator / self.tick_ms)
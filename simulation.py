@@ -0,0 +1,289 @@
+import random
+from typing import List
+
+from constants import *
+from tower import Tower, BasicTower, RapidTower, SniperTower, LaserTower, SlowTower
+from soldier import Soldier
+from enemy import Enemy, BasicEnemy, FastEnemy, TankEnemy, Boss
+from projectile import Projectile
+from spatial_hash import SpatialHash
+from enemy_store import EnemyStore
+from path_index import PathProgressIndex
+from maps import get_map_path, get_difficulty_settings
+
+
+class Simulation:
+    """
+    Game rules only: gold, lives, waves, towers, soldiers, enemies and projectiles.
+    Không cần màn hình, âm thanh hay font nên chạy được headless (test, bot, replay);
+    Game kế thừa lớp này và chỉ lo phần hiển thị và input.
+    """
+
+    # Presenter bật âm thanh theo menu; mô phỏng thuần thì luôn im lặng
+    sound_enabled = False
+
+    def __init__(self, map_name: str = "Forest", difficulty: str = "Medium"):
+        self.map_name = map_name
+        self.difficulty = difficulty
+        self.auto_wave = False
+        self.reset_game()
+
+    def reset_game(self):
+        # Get difficulty settings
+        settings = get_difficulty_settings(self.difficulty)
+
+        self.gold = settings["starting_gold"]
+        self.lives = settings["starting_lives"]
+        self.wave = 1
+        self.game_over = False
+        self.wave_in_progress = False
+        self.towers: List[Tower] = []
+        self.soldiers: List[Soldier] = []
+        self.enemies: List[Enemy] = []
+        self.projectiles: List[Projectile] = []
+        self.enemy_queue: List[str] = []
+        # Lưới không gian của quái, dùng cho mọi truy vấn tầm bắn
+        self.enemy_grid = SpatialHash()
+        # Quái xếp theo quãng đường đã đi, cho tháp chọn mục tiêu first/last
+        self.progress_index = PathProgressIndex()
+        # Get map path
+        self.current_path = get_map_path(self.map_name)
+        # Mảng NumPy chứa trạng thái của mọi quái trên path này
+        self.enemy_store = EnemyStore(self.current_path)
+
+        self.killed_enemies = 0
+
+    def is_valid_tower_position(self, grid_x: int, grid_y: int) -> bool:
+        # Check if position is on a path
+        if (grid_x, grid_y) in self.current_path:
+            return False
+
+        # Check if position is already occupied by a tower
+        for tower in self.towers:
+            if tower.grid_x == grid_x and tower.grid_y == grid_y:
+                return False
+
+        # Check if position is within game boundaries
+        if grid_x < 0 or grid_x >= (SCREEN_WIDTH - PANEL_WIDTH) // GRID_SIZE or grid_y < 0 or grid_y >= SCREEN_HEIGHT // GRID_SIZE:
+            return False
+
+        return True
+
+    def is_valid_soldier_position(self, grid_x: int, grid_y: int) -> bool:
+        # Check if position is on a path
+        if (grid_x, grid_y) not in self.current_path:
+            return False
+
+        # Check if position is already occupied by a soldier
+        for soldier in self.soldiers:
+            if soldier.grid_x == grid_x and soldier.grid_y == grid_y:
+                return False
+
+        # Check if position is within game boundaries
+        if grid_x < 0 or grid_x >= (SCREEN_WIDTH - PANEL_WIDTH) // GRID_SIZE or grid_y < 0 or grid_y >= SCREEN_HEIGHT // GRID_SIZE:
+            return False
+
+        return True
+
+    def place_unit(self, unit_type: str, grid_x: int, grid_y: int) -> bool:
+        # For soldiers, we need to check soldier position validity first
+        if unit_type == "soldier" and self.gold >= 75:
+            if self.is_valid_soldier_position(grid_x, grid_y):
+                self.soldiers.append(Soldier(grid_x, grid_y))
+                self.gold -= 75
+                return True
+            return False
+
+        # For towers, check tower position validity
+        if not self.is_valid_tower_position(grid_x, grid_y):
+            return False
+
+        if unit_type == "basic_tower" and self.gold >= 50:
+            tower = BasicTower(grid_x, grid_y)
+            tower.game = self
+            self.towers.append(tower)
+
+            self.gold -= 50
+            return True
+        elif unit_type == "sniper_tower" and self.gold >= 100:
+            tower = SniperTower(grid_x, grid_y)
+            tower.game = self
+            self.towers.append(tower)
+
+            self.gold -= 100
+            return True
+
+        elif unit_type == "rapid_tower" and self.gold >= 75:
+            tower = RapidTower(grid_x, grid_y)
+            tower.game = self
+            self.towers.append(tower)
+
+            self.gold -= 75
+            return True
+        elif unit_type == "laser_tower" and self.gold >= 120:
+            tower = LaserTower(grid_x, grid_y)
+            tower.game = self
+            self.towers.append(tower)
+            self.gold -= 120
+            return True
+        elif unit_type == "slow_tower" and self.gold >= 90:
+            tower = SlowTower(grid_x, grid_y)
+            tower.game = self
+            self.towers.append(tower)
+            self.gold -= 90
+            return True
+
+        return False
+
+    def start_wave(self):
+
+        self.wave_in_progress = True
+        self.spawn_enemies()
+
+    def spawn_enemies(self):
+        settings = get_difficulty_settings(self.difficulty)
+        # Base number of enemies increases by 30% each wave
+        base_num_enemies = int(5 * (1.3 ** (self.wave - 1)))
+        num_enemies = int(base_num_enemies * settings["wave_size_multiplier"])
+
+        # Different mix of enemies based on wave number
+        num_basic = max(3, num_enemies - self.wave * 2)
+        num_fast = min(self.wave, num_enemies // 3)
+        num_tank = max(0, min(self.wave // 3, 3))
+        num_boss = self.wave // 10
+
+        # Spawn delay between enemies (decreases by 10% each wave, minimum 10)
+        self.spawn_delay = max(10, int(30 * (0.9 ** (self.wave - 1))))
+        self.spawn_counter = 0
+
+        # Prepare enemy queue
+        self.enemy_queue = []
+        for _ in range(num_basic):
+            self.enemy_queue.append("basic")
+        for _ in range(num_fast):
+            self.enemy_queue.append("fast")
+        for _ in range(num_tank):
+            self.enemy_queue.append("tank")
+        for _ in range(num_boss):
+            self.enemy_queue.append('boss')
+        # Shuffle queue for variety
+        random.shuffle(self.enemy_queue)
+
+    def spawn_enemy_from_queue(self):
+        if not self.enemy_queue:
+            return
+
+        settings = get_difficulty_settings(self.difficulty)
+        enemy_type = self.enemy_queue.pop(0)
+
+        if enemy_type == "basic":
+            enemy = BasicEnemy(self.current_path, self)
+        elif enemy_type == "fast":
+            enemy = FastEnemy(self.current_path, self)
+        elif enemy_type == "tank":
+            enemy = TankEnemy(self.current_path, self)
+        elif enemy_type == 'boss':
+            enemy = Boss(self.current_path, self)
+
+        # Apply difficulty multipliers and wave scaling (10% increase per wave)
+        wave_multiplier = 1.0 + (0.1 * (self.wave - 1))  # 10% increase per wave
+
+        enemy.health = int(enemy.health * settings["enemy_health_multiplier"] * wave_multiplier)
+        enemy.max_health = enemy.health
+        enemy.speed *= settings["enemy_speed_multiplier"] * wave_multiplier
+        enemy.reward = int(enemy.reward * settings["enemy_reward_multiplier"] * wave_multiplier)
+        enemy.damage = int(enemy.damage * settings["enemy_health_multiplier"] * wave_multiplier)
+
+        self.enemies.append(enemy)
+        self.enemy_grid.insert(enemy)
+
+    def update(self):
+        """Run one fixed tick of the game rules."""
+        # Spawn enemies if wave in progress
+        if self.wave_in_progress and self.enemy_queue:
+            self.spawn_counter += 1
+            if self.spawn_counter >= self.spawn_delay:
+                self.spawn_counter = 0
+                self.spawn_enemy_from_queue()
+
+        # Check if wave is complete
+        if self.wave_in_progress and not self.enemy_queue and not self.enemies:
+            self.wave_in_progress = False
+            self.wave += 1
+            self.gold += 30 + (self.wave * 2)
+
+            if self.auto_wave:
+                self.start_wave()
+
+        # Update towers: chọn mục tiêu một lần, dùng chung cho ngắm, bắn và laser
+        self.progress_index.rebuild_from_store(self.enemy_store)
+        for tower in self.towers:
+            target = tower.acquire_target(self.enemy_grid)
+            tower.update_cooldown()
+            if tower.can_fire():
+                if target:
+                    result = tower.fire(target)
+                    tower.reset_cooldown()
+
+                    if result:
+                        if isinstance(result, list):
+                            self.projectiles.extend(result)
+                        else:
+                            self.projectiles.append(result)
+
+        # Update soldiers
+        for soldier in self.soldiers[:]:
+            soldier.update_cooldown()
+            if soldier.can_attack():
+                target = soldier.find_target(self.enemy_grid)
+                if target:
+                    soldier.attack(target)
+                    soldier.reset_cooldown()
+
+            # Remove dead soldiers
+            if soldier.is_dead():
+                self.soldiers.remove(soldier)
+
+        # Update projectiles
+        for projectile in self.projectiles[:]:
+            if projectile.move():
+                self.projectiles.remove(projectile)
+
+        # Update enemies: di chuyển cả đàn trên enemy_store, chỉ quái đổi ô / tới đích / chết mới xử lý từng con
+        store = self.enemy_store
+        store.step(self.soldiers)
+        for enemy in store.moved_cell_enemies(self.enemy_grid.cell_size):
+            self.enemy_grid.update(enemy)
+
+        removed = []
+        # Check if enemy reached the end
+        for enemy in store.reached_end_enemies():
+            self.lives -= 1
+            removed.append(enemy)
+            if self.lives <= 0:
+                self.game_over = True
+
+        # Check if enemy is dead
+        for enemy in store.dead_enemies():
+            self.gold += enemy.reward
+            self.killed_enemies += 1
+            removed.append(enemy)
+
+        if removed:
+            for enemy in removed:
+                self.enemy_grid.remove(enemy)
+                store.release(enemy)
+            removed_ids = {id(enemy) for enemy in removed}
+            self.enemies[:] = [enemy for enemy in self.enemies if id(enemy) not in removed_ids]
+
+    def step(self, n_ticks: int = 1) -> int:
+        """Run up to n_ticks ticks, stopping early at game over; returns how many ran."""
+        for tick in range(n_ticks):
+            if self.game_over:
+                return tick
+            self.update()
+        return n_ticks
+
+    def add_explosion(self, x: float, y: float):
+        """Hook called by projectiles on impact; the presenter turns it into an effect."""
+        pass
@@ -1,7 +1,21 @@
 import math
 import pygame
-from typing import List, Optional
+from typing import Optional
 from constants import *
+import sprite_cache
+from dirty_renderer import centered_rect
+from spatial_hash import SpatialHash
+import health_bars
+from render_queue import RenderQueue, LAYER_UNDERLAY, LAYER_SOLDIERS
+import overlays
+
+SOLDIER_IMAGE = "assets/soldier/soldier.png"
+
+
+def soldier_image_size():
+    # Ảnh gốc 96x96, scale theo GRID_SIZE
+    scale_factor = GRID_SIZE / 96
+    return (int(96 * scale_factor), int(96 * scale_factor))
 
 class Soldier:
     def __init__(self, grid_x: int, grid_y: int):
@@ -26,15 +40,10 @@ class Soldier:
         self.regen_cooldown = 0
         self.regen_delay = 60
 
-
-        self.image_original = pygame.image.load("assets/soldier/soldier.png").convert_alpha()
-
-
-        scale_factor = GRID_SIZE / 96
-        new_size = (int(96 * scale_factor), int(96 * scale_factor))
-        self.image = pygame.transform.scale(self.image_original, new_size)
-
-        self.rect = self.image.get_rect(center=(self.x, self.y))
+    @property
+    def image(self) -> pygame.Surface:
+        # Ảnh dùng chung cho mọi soldier, đã scale sẵn; chỉ tải khi vẽ
+        return sprite_cache.load_scaled_image(SOLDIER_IMAGE, soldier_image_size())
 
     def take_damage(self, damage: int):
         """Take damage from enemies. Updates the soldier's health and returns True if the soldier died."""
@@ -58,21 +67,9 @@ class Soldier:
         elif self.health < self.max_health:
             self.health = min(self.max_health, self.health + self.regen_rate)
 
-    def find_target(self, enemies: List['Enemy']) -> Optional['Enemy']:
+    def find_target(self, grid: SpatialHash) -> Optional['Enemy']:
         # Find the closest enemy within range
-        target = None
-        min_distance = float('inf')
-    
-        for enemy in enemies:
-            if enemy.health <= 0:
-                continue
-            
-            distance = math.sqrt((enemy.x - self.x)**2 + (enemy.y - self.y)**2)
-            if distance <= self.range and distance < min_distance:
-                target = enemy
-                min_distance = distance
-    
-        return target
+        return grid.nearest(self.x, self.y, self.range)
 
     def attack(self, target: 'Enemy'):
         target.take_damage(self.damage)
@@ -100,31 +97,30 @@ class Soldier:
     def rotate(self, angle: float):
         self.angle = angle
 
-    def draw(self, screen: pygame.Surface):
+    def get_dirty_rect(self) -> pygame.Rect:
+        # Ảnh đã xoay, thanh máu (cao hơn tâm 25) và vòng tầm đánh khi được chọn
+        width, height = self.image.get_size()
+        half = max(int(math.hypot(width, height) / 2) + 1, 30)
+        if self.is_selected:
+            half = max(half, self.range + 1)
+        return centered_rect(self.x, self.y, half)
+
+    def emit(self, queue: RenderQueue):
         # Vẽ vùng chọn và bán kính nếu đang chọn
         if self.is_selected:
-            pygame.draw.circle(screen, YELLOW, (int(self.x), int(self.y)), self.radius + 2, 2)
-            radius_surface = pygame.Surface((self.range * 2, self.range * 2), pygame.SRCALPHA)
-            pygame.draw.circle(radius_surface, (255, 255, 255, 50), (self.range, self.range), self.range, width=1)
-            screen.blit(radius_surface, (int(self.x) - self.range, int(self.y) - self.range))
+            queue.add_primitive(LAYER_UNDERLAY, pygame.draw.circle, YELLOW, (int(self.x), int(self.y)), self.radius + 2, 2)
+            radius_surface = overlays.get_circle(self.range, (255, 255, 255, 50), width=1)
+            queue.add(LAYER_UNDERLAY, radius_surface, (int(self.x) - self.range, int(self.y) - self.range))
 
         if self.is_dragging:
             # Vẽ vòng tròn bán trong suốt khi đang kéo
-            s = pygame.Surface((self.radius * 2, self.radius * 2), pygame.SRCALPHA)
-            pygame.draw.circle(s, (0, 255, 0, 128), (self.radius, self.radius), self.radius)
-            screen.blit(s, (self.x - self.radius, self.y - self.radius))
+            s = overlays.get_circle(self.radius, (0, 255, 0, 128))
+            queue.add(LAYER_SOLDIERS, s, (int(self.x) - self.radius, int(self.y) - self.radius))
         else:
             # Quay ảnh theo góc hiện tại
-            rotated_image = pygame.transform.rotate(self.image, -self.angle)
-            rotated_rect = rotated_image.get_rect(center=(self.x, self.y))
-            screen.blit(rotated_image, rotated_rect.topleft)
+            rotated_image = sprite_cache.get_rotated(self.image, -self.angle)
+            queue.add_centered(LAYER_SOLDIERS, rotated_image, self.x, self.y)
 
         # Vẽ thanh máu
-        health_bar_length = 30
-        health_ratio = self.health / self.max_health
-        health_bar_width = max(0, health_ratio * health_bar_length)
-
-        pygame.draw.rect(screen, RED, (int(self.x) - health_bar_length // 2, int(self.y) - 25, health_bar_length, 5))
-        pygame.draw.rect(screen, GREEN,
-                         (int(self.x) - health_bar_length // 2, int(self.y) - 25, int(health_bar_width), 5))
+        health_bars.emit(queue, self.x, self.y, 30, 25, self.health, self.max_health)
 
@@ -0,0 +1,79 @@
+import pygame
+from typing import Dict, Optional
+
+# id -> (đường dẫn, âm lượng gốc)
+SOUNDS = {
+    "cannon": ("assets/sounds/cannon_fire.ogg", 0.2),
+    "explosion": ("assets/sounds/explosion.wav", 0.05),
+    "laser": ("assets/sounds/laserpew.ogg", 0.2),
+    "click": ("assets/sounds/Menu Selection Click.wav", 0.3),
+}
+
+# Số voice tối đa được phát đồng thời cho mỗi âm thanh
+MAX_VOICES = {
+    "cannon": 6,
+    "explosion": 4,
+    "laser": 4,
+    "click": 2,
+}
+DEFAULT_MAX_VOICES = 4
+# Hệ số nhân vào số voice tối đa, bộ điều tốc hạ xuống khi máy quá tải
+VOICE_SCALE = 1.0
+
+# Mỗi lần phát trùng trong cùng một frame làm voice to thêm bấy nhiêu (theo tỉ lệ âm lượng gốc)
+COALESCE_GAIN = 0.25
+
+_sounds: Dict[str, pygame.mixer.Sound] = {}
+_pending: Dict[str, int] = {}
+
+
+def get_sound(sound_id: str) -> Optional[pygame.mixer.Sound]:
+    """Decode a sound once and return the shared Sound (None when the mixer is not running)."""
+    if not pygame.mixer.get_init():
+        return None
+    sound = _sounds.get(sound_id)
+    if sound is None:
+        path, _ = SOUNDS[sound_id]
+        sound = pygame.mixer.Sound(path)
+        install(sound_id, sound)
+    return sound
+
+
+def install(sound_id: str, sound: pygame.mixer.Sound):
+    """Register an already decoded Sound for sound_id."""
+    # Âm lượng thật được đặt trên channel lúc phát, để có thể phát to hơn mức gốc
+    sound.set_volume(1.0)
+    _sounds[sound_id] = sound
+
+
+def set_voice_scale(scale: float):
+    """Scale every MAX_VOICES cap (at least one voice per sound is kept)."""
+    global VOICE_SCALE
+    VOICE_SCALE = scale
+
+
+def max_voices(sound_id: str) -> int:
+    return max(1, int(MAX_VOICES.get(sound_id, DEFAULT_MAX_VOICES) * VOICE_SCALE))
+
+
+def play(sound_id: str):
+    """Queue sound_id for this frame; duplicates are merged by flush()."""
+    if pygame.mixer.get_init():
+        _pending[sound_id] = _pending.get(sound_id, 0) + 1
+
+
+def flush():
+    """Play every sound queued this frame, one voice per sound id."""
+    if not _pending:
+        return
+    for sound_id, count in _pending.items():
+        sound = get_sound(sound_id)
+        if sound is None:
+            continue
+        if sound.get_num_channels() >= max_voices(sound_id):
+            continue
+        channel = sound.play()
+        if channel is not None:
+            _, base_volume = SOUNDS[sound_id]
+            channel.set_volume(min(1.0, base_volume * (1 + COALESCE_GAIN * (count - 1))))
+    _pending.clear()
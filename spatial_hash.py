@@ -0,0 +1,134 @@
+from itertools import count
+from typing import Dict, List, Optional, Tuple
+from constants import *
+
+
+class SpatialHash:
+    """
+    Uniform grid over the live enemies, shared by every range query (tower and
+    soldier targeting, splash damage, laser beams).
+    Mỗi quái được dời ô ngay khi di chuyển (update), nên một truy vấn chỉ xét các ô
+    giao với hình vuông bao vòng tròn thay vì toàn bộ danh sách quái.
+    """
+
+    def __init__(self, cell_size: int = GRID_SIZE):
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], List] = {}
+        # id(entity) -> ô đang chứa entity
+        self.entity_cells: Dict[int, Tuple[int, int]] = {}
+        # id(entity) -> thứ tự thêm vào; hoà thì chọn quái thêm trước, như khi duyệt danh sách quái
+        self.order: Dict[int, int] = {}
+        self._counter = count()
+
+    def __len__(self):
+        return len(self.entity_cells)
+
+    def __contains__(self, entity) -> bool:
+        return id(entity) in self.entity_cells
+
+    def cell_of(self, x: float, y: float) -> Tuple[int, int]:
+        return (int(x // self.cell_size), int(y // self.cell_size))
+
+    def insert(self, entity):
+        key = self.cell_of(entity.x, entity.y)
+        self.entity_cells[id(entity)] = key
+        self.order[id(entity)] = next(self._counter)
+        self.cells.setdefault(key, []).append(entity)
+
+    def remove(self, entity):
+        key = self.entity_cells.pop(id(entity), None)
+        if key is None:
+            return
+        del self.order[id(entity)]
+        self._discard(entity, key)
+
+    def _discard(self, entity, key):
+        members = self.cells[key]
+        members.remove(entity)
+        if not members:
+            del self.cells[key]
+
+    def update(self, entity):
+        """Move entity to its new cell after it changed position (no-op if it stayed in the same cell)."""
+        # Simulation chỉ gọi cho quái vừa đổi ô (EnemyStore.moved_cell_enemies); vẫn tự kiểm tra để gọi thừa không hại
+        size = self.cell_size
+        key = (int(entity.x // size), int(entity.y // size))
+        old_key = self.entity_cells.get(id(entity))
+        if key == old_key:
+            return
+        if old_key is None:
+            self.order[id(entity)] = next(self._counter)
+        else:
+            self._discard(entity, old_key)
+        self.entity_cells[id(entity)] = key
+        self.cells.setdefault(key, []).append(entity)
+
+    def clear(self):
+        self.cells.clear()
+        self.entity_cells.clear()
+        self.order.clear()
+
+    def _cells_around(self, x: float, y: float, radius: float) -> List[List]:
+        """Non-empty cells overlapping the square around the circle."""
+        cells = self.cells
+        if not cells:
+            return []
+        size = self.cell_size
+        min_cx = int((x - radius) // size)
+        max_cx = int((x + radius) // size)
+        min_cy = int((y - radius) // size)
+        max_cy = int((y + radius) // size)
+        if (max_cx - min_cx + 1) * (max_cy - min_cy + 1) > len(cells):
+            # Ít ô có quái hơn số ô cần dò (tầm bắn lớn, quái thưa): duyệt thẳng các ô có quái
+            return [members for (cx, cy), members in cells.items()
+                    if min_cx <= cx <= max_cx and min_cy <= cy <= max_cy]
+        found = []
+        get = cells.get
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                members = get((cx, cy))
+                if members:
+                    found.append(members)
+        return found
+
+    def query_circle(self, x: float, y: float, radius: float) -> List:
+        """Every entity whose centre is within radius of (x, y), boundary included."""
+        radius_sq = radius * radius
+        found = []
+        for members in self._cells_around(x, y, radius):
+            for entity in members:
+                dx = entity.x - x
+                dy = entity.y - y
+                if dx * dx + dy * dy <= radius_sq:
+                    found.append(entity)
+        return found
+
+    def nearest(self, x: float, y: float, radius: float) -> Optional[object]:
+        """Closest living entity within radius of (x, y), or None; ties go to the first inserted."""
+        best = None
+        best_sq = radius * radius
+        order = self.order
+        for members in self._cells_around(x, y, radius):
+            for entity in members:
+                if entity.health <= 0:
+                    continue
+                dx = entity.x - x
+                dy = entity.y - y
+                distance_sq = dx * dx + dy * dy
+                if distance_sq < best_sq or (distance_sq == best_sq and
+                                             (best is None or order[id(entity)] < order[id(best)])):
+                    best = entity
+                    best_sq = distance_sq
+        return best
+
+    def strongest(self, x: float, y: float, radius: float) -> Optional[object]:
+        """Living entity with the most health within radius of (x, y), or None; ties go to the earliest inserted."""
+        best = None
+        order = self.order
+        for entity in self.query_circle(x, y, radius):
+            if entity.health <= 0:
+                continue
+            if (best is None or entity.health > best.health or
+                    (entity.health == best.health and order[id(entity)] < order[id(best)])):
+                best = entity
+        return best
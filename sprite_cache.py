@@ -0,0 +1,267 @@
+import hashlib
+import mmap
+import os
+import pygame
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+from constants import *
+
+# Sprite sheets đã decode, dùng chung cho toàn bộ process
+_sheets: Dict[str, pygame.Surface] = {}
+# Frame đã cắt và scale, key = (path, frame_width, frame_height, row, num_cols, scale_width, scale_height)
+_frames: Dict[tuple, Tuple[pygame.Surface, ...]] = {}
+# Ảnh đã xoay, key = (frame, số bước góc, bucket); LRU giới hạn theo bộ nhớ
+_rotations: "OrderedDict[tuple, pygame.Surface]" = OrderedDict()
+_rotation_bytes = 0
+# Trạng thái màn hình lúc cache được tạo, dùng để phát hiện khi cần làm mới
+_display_signature = None
+
+ROTATION_STEPS = 72  # 5 độ mỗi bước
+ROTATION_CACHE_BYTES = 64 * 1024 * 1024
+
+# Ảnh đã scale theo độ phân giải được lưu thô trên đĩa để lần chạy sau khỏi decode PNG
+DISK_CACHE_ENABLED = True
+DISK_CACHE_DIR = ".asset_cache"
+
+
+def _current_display_signature():
+    surface = pygame.display.get_surface()
+    if surface is None:
+        return (GRID_SIZE, None, None)
+    return (GRID_SIZE, surface.get_size(), surface.get_bitsize())
+
+
+def invalidate():
+    """Drop every cached sheet and frame (call after GRID_SIZE or the display mode changes)."""
+    global _display_signature
+    _sheets.clear()
+    _frames.clear()
+    clear_rotations()
+    _display_signature = None
+
+
+def _check_display():
+    global _display_signature
+    signature = _current_display_signature()
+    if signature != _display_signature:
+        _sheets.clear()
+        _frames.clear()
+        clear_rotations()
+        _display_signature = signature
+
+
+def load_sheet(path: str) -> pygame.Surface:
+    """Decode a sprite sheet once and return the shared surface."""
+    _check_display()
+    sheet = _sheets.get(path)
+    if sheet is None:
+        sheet = pygame.image.load(path).convert_alpha()
+        _sheets[path] = sheet
+    return sheet
+
+
+def _pixel_format(surface: pygame.Surface) -> str:
+    # Thứ tự byte của surface theo định dạng màn hình, để ghi/đọc không phải đổi kênh màu
+    masks = surface.get_masks()
+    if surface.get_bytesize() == 4 and all(masks):
+        order = sorted(zip(masks, "RGBA"), key=lambda item: item[0])
+        fmt = "".join(channel for _, channel in order)
+        if fmt in ("RGBA", "BGRA", "ARGB"):
+            return fmt
+    return "RGBA"
+
+
+def _disk_cache_path(path: str, key: tuple) -> Optional[str]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    surface = pygame.display.get_surface()
+    fmt = _pixel_format(surface) if surface is not None else "RGBA"
+    full_key = (path, stat.st_mtime_ns, stat.st_size, key, GRID_SIZE, SCREEN_WIDTH, SCREEN_HEIGHT, fmt)
+    digest = hashlib.sha1(repr(full_key).encode("utf-8")).hexdigest()[:20]
+    name = os.path.splitext(os.path.basename(path))[0].replace(" ", "_")
+    return os.path.join(DISK_CACHE_DIR, f"{name}-{digest}.{fmt.lower()}")
+
+
+def _read_disk_cache(cache_path: str, size: Tuple[int, int]) -> Optional[pygame.Surface]:
+    fmt = cache_path.rsplit(".", 1)[1].upper()
+    try:
+        with open(cache_path, "rb") as file:
+            if os.fstat(file.fileno()).st_size != size[0] * size[1] * 4:
+                return None
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                # frombuffer không copy; copy() sang surface riêng trước khi đóng mmap
+                return pygame.image.frombuffer(buffer, size, fmt).copy()
+    except (OSError, ValueError, pygame.error):
+        return None
+
+
+def _write_disk_cache(cache_path: str, surface: pygame.Surface):
+    fmt = cache_path.rsplit(".", 1)[1].upper()
+    try:
+        os.makedirs(DISK_CACHE_DIR, exist_ok=True)
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(pygame.image.tobytes(surface, fmt))
+        os.replace(tmp_path, cache_path)
+    except (OSError, pygame.error):
+        pass
+
+
+def _decode(path: str) -> pygame.Surface:
+    # Chỉ decode, không convert theo màn hình: an toàn khi gọi từ thread phụ
+    image = pygame.image.load(path)
+    if image.get_flags() & pygame.SRCALPHA:
+        return image
+    # Ảnh palette/colorkey: chuyển sang RGBA, điểm colorkey thành trong suốt như convert_alpha()
+    rgba = pygame.Surface(image.get_size(), pygame.SRCALPHA)
+    rgba.blit(image, (0, 0))
+    return rgba
+
+
+class PreparedAsset:
+    """A scaled surface produced off the main thread, waiting for install() to convert and cache it."""
+
+    def __init__(self, key: tuple, surface: pygame.Surface, cache_path: Optional[str], from_disk: bool,
+                 num_cols: int = 1):
+        self.key = key
+        self.surface = surface
+        self.cache_path = cache_path
+        self.from_disk = from_disk
+        self.num_cols = num_cols
+
+
+def _prepare(path: str, key: tuple, size: Tuple[int, int], build: Callable[[], pygame.Surface],
+             num_cols: int = 1) -> PreparedAsset:
+    cache_path = _disk_cache_path(path, key) if DISK_CACHE_ENABLED else None
+    if cache_path is not None and os.path.exists(cache_path):
+        surface = _read_disk_cache(cache_path, size)
+        if surface is not None:
+            return PreparedAsset(key, surface, cache_path, True, num_cols)
+    return PreparedAsset(key, build(), cache_path, False, num_cols)
+
+
+def prepare_row_frames(path: str, frame_width: int, frame_height: int, row: int, num_cols: int,
+                       scale_width: int, scale_height: int, load: Callable[[str], pygame.Surface] = _decode
+                       ) -> PreparedAsset:
+    """Read or build the scaled frame strip of one sheet row; safe to call from a worker thread."""
+    key = (path, frame_width, frame_height, row, num_cols, scale_width, scale_height)
+
+    def build_strip():
+        # Ghép các frame đã scale thành một dải ngang để lưu một file duy nhất
+        sheet = load(path)
+        strip = pygame.Surface((scale_width * num_cols, scale_height), pygame.SRCALPHA)
+        for col in range(num_cols):
+            frame = sheet.subsurface(pygame.Rect(col * frame_width, row * frame_height, frame_width, frame_height))
+            strip.blit(pygame.transform.scale(frame, (scale_width, scale_height)), (col * scale_width, 0),
+                       special_flags=pygame.BLEND_RGBA_MAX)
+        return strip
+
+    return _prepare(path, key, (scale_width * num_cols, scale_height), build_strip, num_cols)
+
+
+def prepare_scaled_image(path: str, size: Tuple[int, int], load: Callable[[str], pygame.Surface] = _decode
+                         ) -> PreparedAsset:
+    """Read or build one whole scaled image; safe to call from a worker thread."""
+    key = (path, size)
+    return _prepare(path, key, size, lambda: pygame.transform.scale(load(path), size))
+
+
+def install(prepared: PreparedAsset) -> Tuple[pygame.Surface, ...]:
+    """Convert a prepared surface to the display format and put it in the cache (main thread only)."""
+    _check_display()
+    frames = _frames.get(prepared.key)
+    if frames is not None:
+        return frames
+    surface = prepared.surface.convert_alpha()
+    if prepared.cache_path is not None and not prepared.from_disk:
+        _write_disk_cache(prepared.cache_path, surface)
+    if prepared.num_cols == 1:
+        frames = (surface,)
+    else:
+        width = surface.get_width() // prepared.num_cols
+        height = surface.get_height()
+        frames = tuple(
+            surface.subsurface(pygame.Rect(col * width, 0, width, height)).copy()
+            for col in range(prepared.num_cols)
+        )
+    _frames[prepared.key] = frames
+    return frames
+
+
+def load_row_frames(path: str, frame_width: int, frame_height: int, row: int, num_cols: int,
+                    scale_width: int, scale_height: int) -> Tuple[pygame.Surface, ...]:
+    """Return the scaled frames of one sheet row, slicing and scaling only on the first call."""
+    _check_display()
+    key = (path, frame_width, frame_height, row, num_cols, scale_width, scale_height)
+    frames = _frames.get(key)
+    if frames is None:
+        frames = install(prepare_row_frames(path, frame_width, frame_height, row, num_cols,
+                                            scale_width, scale_height, load=load_sheet))
+    return frames
+
+
+def load_scaled_image(path: str, size: Tuple[int, int], keep_source: bool = True) -> pygame.Surface:
+    """
+    Return the whole image at path scaled to size, scaling only on the first call.
+    keep_source=False không giữ ảnh gốc trong cache (dùng cho ảnh lớn như bản đồ).
+    """
+    _check_display()
+    key = (path, size)
+    frames = _frames.get(key)
+    if frames is None:
+        frames = install(prepare_scaled_image(path, size, load=load_sheet if keep_source else _decode))
+    return frames[0]
+
+
+def surface_bytes(surfaces) -> int:
+    """Pixel memory held by the given surfaces (subsurfaces share their parent's pixels)."""
+    total = 0
+    for surface in surfaces:
+        if surface.get_parent() is None:
+            width, height = surface.get_size()
+            total += width * height * surface.get_bytesize()
+    return total
+
+
+def memory_bytes() -> int:
+    """Pixel memory held by every sheet, frame and rotated surface in the cache."""
+    frames = [frame for frames in _frames.values() for frame in frames]
+    return surface_bytes(_sheets.values()) + surface_bytes(frames) + _rotation_bytes
+
+
+def clear_rotations():
+    """Drop every cached rotated surface."""
+    global _rotation_bytes
+    _rotations.clear()
+    _rotation_bytes = 0
+
+
+def set_rotation_steps(steps: int):
+    """Change how many angle buckets a full turn is split into."""
+    global ROTATION_STEPS
+    if steps != ROTATION_STEPS:
+        ROTATION_STEPS = steps
+        clear_rotations()
+
+
+def get_rotated(frame: pygame.Surface, angle: float, steps: Optional[int] = None) -> pygame.Surface:
+    """pygame.transform.rotate(frame, angle), snapped to ROTATION_STEPS (or steps) buckets and cached."""
+    global _rotation_bytes
+    if steps is None:
+        steps = ROTATION_STEPS
+    bucket = int(round((angle % 360) * steps / 360)) % steps
+    key = (frame, steps, bucket)
+    rotated = _rotations.get(key)
+    if rotated is not None:
+        _rotations.move_to_end(key)
+        return rotated
+
+    rotated = pygame.transform.rotate(frame, bucket * 360 / steps)
+    _rotations[key] = rotated
+    _rotation_bytes += surface_bytes((rotated,))
+    while _rotation_bytes > ROTATION_CACHE_BYTES and len(_rotations) > 1:
+        _, evicted = _rotations.popitem(last=False)
+        _rotation_bytes -= surface_bytes((evicted,))
+    return rotated
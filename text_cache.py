@@ -0,0 +1,66 @@
+import pygame
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+# Chữ đã render, key = (font, text, color, antialias); LRU
+MAX_CACHED_TEXTS = 256
+_texts: "OrderedDict[tuple, pygame.Surface]" = OrderedDict()
+# Bảng chữ số đã render sẵn, key = (font, color)
+_atlases: Dict[tuple, "DigitAtlas"] = {}
+
+
+def render_text(font: pygame.font.Font, text: str, color, antialias: bool = True) -> pygame.Surface:
+    """font.render(text, antialias, color), rasterized once and reused."""
+    key = (font, text, tuple(color), antialias)
+    surface = _texts.get(key)
+    if surface is not None:
+        _texts.move_to_end(key)
+        return surface
+    surface = font.render(text, antialias, color)
+    _texts[key] = surface
+    if len(_texts) > MAX_CACHED_TEXTS:
+        _texts.popitem(last=False)
+    return surface
+
+
+def clear():
+    _texts.clear()
+    _atlases.clear()
+
+
+class DigitAtlas:
+    """Pre-rendered glyphs for 0-9 and '-', so numeric counters never touch the font rasterizer."""
+
+    GLYPHS = "0123456789-"
+
+    def __init__(self, font: pygame.font.Font, color):
+        self.glyphs = {char: font.render(char, True, color) for char in self.GLYPHS}
+        self.height = max(glyph.get_height() for glyph in self.glyphs.values())
+
+    def draw_number(self, screen: pygame.Surface, value: int, pos: Tuple[int, int]) -> pygame.Rect:
+        x, y = pos
+        blits = []
+        for char in str(value):
+            glyph = self.glyphs[char]
+            blits.append((glyph, (x, y)))
+            x += glyph.get_width()
+        screen.blits(blits, doreturn=False)
+        return pygame.Rect(pos[0], y, x - pos[0], self.height)
+
+
+def get_digit_atlas(font: pygame.font.Font, color) -> DigitAtlas:
+    key = (font, tuple(color))
+    atlas = _atlases.get(key)
+    if atlas is None:
+        atlas = DigitAtlas(font, color)
+        _atlases[key] = atlas
+    return atlas
+
+
+def draw_counter(screen: pygame.Surface, font: pygame.font.Font, label: str, value: int, color,
+                 pos: Tuple[int, int]) -> pygame.Rect:
+    """Draw "label" + value, with the label from the text cache and the digits from the atlas."""
+    label_surface = render_text(font, label, color)
+    screen.blit(label_surface, pos)
+    number_rect = get_digit_atlas(font, color).draw_number(screen, value, (pos[0] + label_surface.get_width(), pos[1]))
+    return pygame.Rect(pos, label_surface.get_size()).union(number_rect)
@@ -1,11 +1,57 @@
 import math
+import numpy as np
 import pygame
 from typing import List, Optional, Tuple
 from constants import *
 from projectile import Projectile, SlowProjectile
+import sprite_cache
+from dirty_renderer import centered_rect
+from spatial_hash import SpatialHash
+from path_index import TARGET_MODES, path_intervals
+import sound_bank
+import overlays
+from render_queue import RenderQueue, LAYER_UNDERLAY, LAYER_TOWERS
+
+# Sprite sheet của từng loại tower: (đường dẫn, số frame); mỗi frame 128x128
+TOWER_SPRITE_SHEETS = {
+    "basic_tower": ("assets/tower/basic_tower.png", 8),
+    "rapid_tower": ("assets/tower/rapid_tower.png", 8),
+    "sniper_tower": ("assets/tower/sniper_tower.png", 8),
+    "slow_tower": ("assets/tower/slow_tower.png", 11),
+}
+TOWER_FRAME_SIZE = 128
+TOWER_SCALE_FACTOR = 1.8
+LASER_TOWER_IMAGE = "assets/tower/laser_tower.png"
+LASER_SCALE_FACTOR = 0.6
+# Các tia laser lệch nhau 10 độ; quái lệch khỏi tia dưới LASER_HIT_ANGLE (radian) thì bị trúng
+LASER_SPREAD_DEGREES = 10
+LASER_HIT_ANGLE = 0.15
+
+
+def load_tower_frames(tower_type: str) -> Tuple[pygame.Surface, ...]:
+    """Shared, already scaled animation frames for a tower type."""
+    path, num_frames = TOWER_SPRITE_SHEETS[tower_type]
+    size = int(GRID_SIZE * TOWER_SCALE_FACTOR)
+    return sprite_cache.load_row_frames(path, TOWER_FRAME_SIZE, TOWER_FRAME_SIZE, 0, num_frames, size, size)
+
+
+def load_laser_tower_image() -> pygame.Surface:
+    """Shared, already scaled image for the laser tower."""
+    size = int(TOWER_FRAME_SIZE * LASER_SCALE_FACTOR)
+    return sprite_cache.load_scaled_image(LASER_TOWER_IMAGE, (size, size))
+
+
+def preload_tower_assets() -> int:
+    """Build every tower type's frames up front; returns the bytes of surface memory they hold."""
+    surfaces = [frame for tower_type in TOWER_SPRITE_SHEETS for frame in load_tower_frames(tower_type)]
+    surfaces.append(load_laser_tower_image())
+    return sprite_cache.surface_bytes(surfaces)
 
 
 class Tower:
+    # Key trong TOWER_SPRITE_SHEETS; None = tháp không có animation
+    sprite_type: Optional[str] = None
+
     def __init__(self, grid_x: int, grid_y: int, damage: int, range_radius: int, fire_rate: float, cost: int):
         self.grid_x = grid_x
         self.grid_y = grid_y
@@ -22,9 +68,24 @@ class Tower:
         self.drag_offset_y = 0
         self.level = 1
         self.game = None
-
-        self.shoot_sound = pygame.mixer.Sound("assets/sounds/cannon_fire.ogg")
-        self.shoot_sound.set_volume(0.2)
+        # Mục tiêu giữ qua các tick cho tới khi chết hoặc ra khỏi tầm (xem acquire_target)
+        self.target: Optional['Enemy'] = None
+        self.target_mode = TARGET_MODES[0]
+        # Các đoạn path trong tầm bắn, tính lại khi tháp đổi vị trí hoặc tầm
+        self._path_intervals = []
+        self._path_intervals_key = None
+        self._frames = None
+
+    @property
+    def frames(self) -> Tuple[pygame.Surface, ...]:
+        # Chỉ tải ảnh khi vẽ lần đầu, mô phỏng không cần đến sprite
+        if self._frames is None:
+            self._frames = load_tower_frames(self.sprite_type) if self.sprite_type else ()
+        return self._frames
+
+    @property
+    def frame_count(self) -> int:
+        return TOWER_SPRITE_SHEETS[self.sprite_type][1] if self.sprite_type else 0
 
     def upgrade(self):
         self.level += 1
@@ -42,21 +103,44 @@ class Tower:
         if self.cooldown > 0:
             self.cooldown -= 1
 
-    def find_target(self, enemies: List['Enemy']) -> Optional['Enemy']:
-        # Find the closest enemy within range
-        target = None
-        min_distance = float('inf')
-    
-        for enemy in enemies:
-            if enemy.health <= 0:
-                continue
-            
-            distance = math.sqrt((enemy.x - self.x)**2 + (enemy.y - self.y)**2)
-            if distance <= self.range and distance < min_distance:
-                target = enemy
-                min_distance = distance
-    
-        return target
+    def find_target(self, grid: SpatialHash) -> Optional['Enemy']:
+        # Chọn quái trong tầm theo target_mode: gần nhất, đi xa nhất, đi ít nhất hoặc máu nhiều nhất
+        if self.target_mode == "strongest":
+            return grid.strongest(self.x, self.y, self.range)
+        if self.target_mode in ("first", "last") and self.game:
+            intervals = self.path_intervals(self.game.current_path)
+            index = self.game.progress_index
+            if self.target_mode == "first":
+                return index.first_in(intervals, self.x, self.y, self.range)
+            return index.last_in(intervals, self.x, self.y, self.range)
+        return grid.nearest(self.x, self.y, self.range)
+
+    def path_intervals(self, path) -> list:
+        key = (self.x, self.y, self.range, id(path))
+        if key != self._path_intervals_key:
+            self._path_intervals = path_intervals(path, self.x, self.y, self.range)
+            self._path_intervals_key = key
+        return self._path_intervals
+
+    def cycle_target_mode(self):
+        """Switch to the next targeting mode and drop the cached target so it is picked again."""
+        self.target_mode = TARGET_MODES[(TARGET_MODES.index(self.target_mode) + 1) % len(TARGET_MODES)]
+        self.target = None
+
+    def acquire_target(self, grid: SpatialHash) -> Optional['Enemy']:
+        """
+        Targeting pass, once per tick.
+        "nearest" giữ mục tiêu cũ khi nó còn sống và trong tầm; first/last/strongest chọn lại mỗi tick
+        (truy vấn rẻ) vì quái mới vào tầm, quái nhanh vượt lên hay boss xuất hiện đổi kết quả.
+        """
+        target = self.target
+        if self.target_mode == "nearest" and target is not None and target.health > 0 and target in grid:
+            dx = target.x - self.x
+            dy = target.y - self.y
+            if dx * dx + dy * dy <= self.range * self.range:
+                return target
+        self.target = self.find_target(grid)
+        return self.target
 
     def fire(self, target: 'Enemy') -> Projectile:
         # Create a new projectile targeting the enemy
@@ -79,66 +163,69 @@ class Tower:
         self.x = grid_x * GRID_SIZE + GRID_SIZE // 2
         self.y = grid_y * GRID_SIZE + GRID_SIZE // 2
 
-    def draw(self, screen: pygame.Surface, show_range: bool = False):
+    def emit(self, queue: RenderQueue, show_range: bool = False):
         # Draw selection indicator
         if self.is_selected:
-            pygame.draw.rect(screen, YELLOW,(self.grid_x * GRID_SIZE - 2, self.grid_y * GRID_SIZE - 2,GRID_SIZE + 4, GRID_SIZE + 4), 2)
+            queue.add_primitive(LAYER_TOWERS, pygame.draw.rect, YELLOW,(self.grid_x * GRID_SIZE - 2, self.grid_y * GRID_SIZE - 2,GRID_SIZE + 4, GRID_SIZE + 4), 2)
 
         # Draw range circle if selected
         if show_range or self.is_selected:
-            pygame.draw.circle(screen, (255, 255, 255, 100), (int(self.x), int(self.y)), self.range, 1)
+            queue.add_primitive(LAYER_UNDERLAY, pygame.draw.circle, (255, 255, 255, 100), (int(self.x), int(self.y)), self.range, 1)
 
         # Draw tower body
         if self.is_dragging:
             # Draw semi-transparent tower while dragging
-            s = pygame.Surface((GRID_SIZE, GRID_SIZE), pygame.SRCALPHA)
-            s.fill((128, 128, 128, 128))
-            screen.blit(s, (self.x - GRID_SIZE//2, self.y - GRID_SIZE//2))
+            s = overlays.get_rect((GRID_SIZE, GRID_SIZE), (128, 128, 128, 128))
+            queue.add_centered(LAYER_TOWERS, s, self.x, self.y)
         else:
-            pygame.draw.rect(screen, GRAY, (self.grid_x * GRID_SIZE, self.grid_y * GRID_SIZE, GRID_SIZE, GRID_SIZE))
-            pygame.draw.rect(screen, BLACK, (self.grid_x * GRID_SIZE, self.grid_y * GRID_SIZE, GRID_SIZE, GRID_SIZE), 2)
-
+            queue.add_primitive(LAYER_TOWERS, pygame.draw.rect, GRAY, (self.grid_x * GRID_SIZE, self.grid_y * GRID_SIZE, GRID_SIZE, GRID_SIZE))
+            queue.add_primitive(LAYER_TOWERS, pygame.draw.rect, BLACK, (self.grid_x * GRID_SIZE, self.grid_y * GRID_SIZE, GRID_SIZE, GRID_SIZE), 2)
+
+    def get_dirty_rect(self, show_range: bool = False) -> pygame.Rect:
+        # Sprite đã xoay, ô đang chọn (theo grid) và vòng tầm bắn nếu đang hiện
+        size = GRID_SIZE
+        frames = getattr(self, "frames", None)
+        image = getattr(self, "image", None)
+        if frames:
+            size = max(frames[0].get_size())
+        elif image is not None:
+            size = max(image.get_size())
+        half = max(int(size * 0.71) + 2, GRID_SIZE // 2 + 4)
+        cell = pygame.Rect(self.grid_x * GRID_SIZE - 4, self.grid_y * GRID_SIZE - 4, GRID_SIZE + 8, GRID_SIZE + 8)
+        if show_range or self.is_selected:
+            half = max(half, self.range + 1)
+            cell = centered_rect(cell.centerx, cell.centery, self.range + 1, cell)
+        return centered_rect(self.x, self.y, half, cell)
 
 
 class BasicTower(Tower):
+    sprite_type = "basic_tower"
+
     def __init__(self, grid_x: int, grid_y: int):
         super().__init__(grid_x, grid_y, damage=15, range_radius=120, fire_rate=30, cost=50)
         self.animation_timer = 0
         self.is_animating = False
-        # Load sprite sheet mới
-        self.sprite_sheet = pygame.image.load("assets/tower/basic_tower.png").convert_alpha()
-        self.frame_width = 128  # Chiều rộng mỗi frame
-        self.frame_height = 128  # Chiều cao mỗi frame
-        self.frames = []
         self.current_frame = 0
-        # Cắt sprite sheet thành 8 frame và scale về GRID_SIZE
-        scale_factor = 1.8  # Hoặc 1.5 nếu muốn lớn hơn 1 ô
-        for i in range(8):
-            frame = self.sprite_sheet.subsurface(pygame.Rect(i * self.frame_width, 0, self.frame_width, self.frame_height))
-            self.frames.append(pygame.transform.scale(frame, (int(GRID_SIZE * scale_factor), int(GRID_SIZE * scale_factor))))
         self.angle = 0
-        scale_factor = 1.8
+        scale_factor = TOWER_SCALE_FACTOR
         self.cannon_length = 28 * scale_factor  # Điều chỉnh dựa trên khoảng cách thực tế đến đầu nòng
         self.cannon_offset_x = 0  # Nòng súng ở giữa theo trục x
         self.cannon_offset_y = -32 * scale_factor  +64
 
-    def draw(self, screen: pygame.Surface, show_range: bool = False):
+    def emit(self, queue: RenderQueue, show_range: bool = False):
         if self.is_selected:
-            pygame.draw.rect(screen, YELLOW,(self.grid_x * GRID_SIZE - 2,self.grid_y * GRID_SIZE - 2,GRID_SIZE + 4, GRID_SIZE + 4), 2)
+            queue.add_primitive(LAYER_TOWERS, pygame.draw.rect, YELLOW,(self.grid_x * GRID_SIZE - 2,self.grid_y * GRID_SIZE - 2,GRID_SIZE + 4, GRID_SIZE + 4), 2)
         if show_range or self.is_selected:
-            pygame.draw.circle(screen, (255, 255, 255, 100), (int(self.x), int(self.y)), self.range, 1)
+            queue.add_primitive(LAYER_UNDERLAY, pygame.draw.circle, (255, 255, 255, 100), (int(self.x), int(self.y)), self.range, 1)
         if self.is_dragging:
-            s = pygame.Surface((GRID_SIZE, GRID_SIZE), pygame.SRCALPHA)
-            s.fill((128, 128, 128, 128))
-            screen.blit(s, (self.x - GRID_SIZE // 2, self.y - GRID_SIZE // 2))
+            s = overlays.get_rect((GRID_SIZE, GRID_SIZE), (128, 128, 128, 128))
+            queue.add_centered(LAYER_TOWERS, s, self.x, self.y)
         else:
             if self.frames:
                 frame_to_draw = self.current_frame if self.is_animating else 0
                 original_frame = self.frames[frame_to_draw]
-                rotated_frame = pygame.transform.rotate(original_frame, -(self.angle+90))
-                new_rect = rotated_frame.get_rect(center=(self.x, self.y))
-
-                screen.blit(rotated_frame, new_rect.topleft)
+                rotated_frame = sprite_cache.get_rotated(original_frame, -(self.angle+90))
+                queue.add_centered(LAYER_TOWERS, rotated_frame, self.x, self.y)
 
     def update_angle(self, target: 'Enemy'):
         if target:
@@ -149,11 +236,11 @@ class BasicTower(Tower):
             self.angle = math.degrees(math.atan2(dy, dx))
 
     def fire(self, target: 'Enemy') -> Projectile:
-        if self.game and self.game.menu.sound_enabled:
-            self.shoot_sound.play()
+        if self.game and self.game.sound_enabled:
+            sound_bank.play("cannon")
 
         self.is_animating = True
-        self.animation_timer = len(self.frames) * 5
+        self.animation_timer = self.frame_count * 5
         self.current_frame = 0
 
         dx = target.x - self.x
@@ -167,12 +254,12 @@ class BasicTower(Tower):
 
         return Projectile(cannon_x, cannon_y, target, self.damage, 5, YELLOW)
 
-    def update_cooldown(self,enemies):
+    def update_cooldown(self):
 
         if self.cooldown > 0:
             self.cooldown -= 1
 
-        target = self.find_target(enemies)
+        target = self.target
         if target:
             dx = target.x - self.x
             dy = target.y - self.y
@@ -183,44 +270,36 @@ class BasicTower(Tower):
             if self.animation_timer <= 0:
                 self.is_animating = False
             else:
-                self.current_frame = (len(self.frames) - 1) - (self.animation_timer // 5)
+                self.current_frame = (self.frame_count - 1) - (self.animation_timer // 5)
 
 class RapidTower(Tower):
+    sprite_type = "rapid_tower"
+
     def __init__(self, grid_x: int, grid_y: int):
         super().__init__(grid_x, grid_y, damage=10, range_radius=120, fire_rate=15, cost=75)
         self.animation_timer = 0
         self.is_animating = False
-        # Load sprite sheet mới
-        self.sprite_sheet = pygame.image.load("assets/tower/rapid_tower.png").convert_alpha()
-        self.frame_width = 128
-        self.frame_height = 128
-        self.frames = []
         self.current_frame = 0
-        scale_factor = 1.8
-        for i in range(8):
-            frame = self.sprite_sheet.subsurface(pygame.Rect(i * self.frame_width, 0, self.frame_width, self.frame_height))
-            self.frames.append(pygame.transform.scale(frame, (int(GRID_SIZE * scale_factor), int(GRID_SIZE * scale_factor))))
+        scale_factor = TOWER_SCALE_FACTOR
         self.angle = 0
         self.cannon_length = 15 * scale_factor
         self.cannon_offset_x = 0
         self.cannon_offset_y = -int(GRID_SIZE * scale_factor * 0.5) + 64
 
-    def draw(self, screen: pygame.Surface, show_range: bool = False):
+    def emit(self, queue: RenderQueue, show_range: bool = False):
         if show_range or self.is_selected:
-            pygame.draw.circle(screen, (255, 255, 255, 100), (int(self.x), int(self.y)), self.range, 1)
+            queue.add_primitive(LAYER_UNDERLAY, pygame.draw.circle, (255, 255, 255, 100), (int(self.x), int(self.y)), self.range, 1)
         if self.is_dragging:
-            s = pygame.Surface((GRID_SIZE, GRID_SIZE), pygame.SRCALPHA)
-            s.fill((128, 128, 128, 128))
-            screen.blit(s, (self.x - GRID_SIZE // 2, self.y - GRID_SIZE // 2))
+            s = overlays.get_rect((GRID_SIZE, GRID_SIZE), (128, 128, 128, 128))
+            queue.add_centered(LAYER_TOWERS, s, self.x, self.y)
         else:
             if self.frames:
                 frame_to_draw = self.current_frame if self.is_animating else 0
                 original_frame = self.frames[frame_to_draw]
-                rotated_frame = pygame.transform.rotate(original_frame, -(self.angle+90))
-                new_rect = rotated_frame.get_rect(center=(self.x, self.y))
-                screen.blit(rotated_frame, new_rect.topleft)
+                rotated_frame = sprite_cache.get_rotated(original_frame, -(self.angle+90))
+                queue.add_centered(LAYER_TOWERS, rotated_frame, self.x, self.y)
         if self.is_selected:
-            pygame.draw.rect(screen, YELLOW,
+            queue.add_primitive(LAYER_TOWERS, pygame.draw.rect, YELLOW,
                             (self.grid_x * GRID_SIZE - 2,
                              self.grid_y * GRID_SIZE - 2,
                              GRID_SIZE + 4, GRID_SIZE + 4), 2)
@@ -234,11 +313,11 @@ class RapidTower(Tower):
             self.angle = math.degrees(math.atan2(dy, dx))
 
     def fire(self, target: 'Enemy') -> List[Projectile]:
-        if self.game and self.game.menu.sound_enabled:
-            self.shoot_sound.play()
+        if self.game and self.game.sound_enabled:
+            sound_bank.play("cannon")
 
         self.is_animating = True
-        self.animation_timer = len(self.frames) * 5
+        self.animation_timer = self.frame_count * 5
         self.current_frame = 0
 
         dx = target.x - self.x
@@ -274,10 +353,10 @@ class RapidTower(Tower):
 
         return [proj1, proj2]
 
-    def update_cooldown(self,enemies):
+    def update_cooldown(self):
         if self.cooldown > 0:
             self.cooldown -= 1
-        target = self.find_target(enemies)
+        target = self.target
         if target:
             dx = target.x - self.x
             dy = target.y - self.y
@@ -287,23 +366,17 @@ class RapidTower(Tower):
             if self.animation_timer <= 0:
                 self.is_animating = False
             else:
-                self.current_frame = (len(self.frames) - 1) - (self.animation_timer // 5)
+                self.current_frame = (self.frame_count - 1) - (self.animation_timer // 5)
 
 class SniperTower(Tower):
+    sprite_type = "sniper_tower"
+
     def __init__(self, grid_x: int, grid_y: int):
         super().__init__(grid_x, grid_y, damage=15, range_radius=200, fire_rate=60, cost=100)
         self.animation_timer = 0
         self.is_animating = False
-        # Load sprite sheet mới
-        self.sprite_sheet = pygame.image.load("assets/tower/sniper_tower.png").convert_alpha()
-        self.frame_width = 128
-        self.frame_height = 128
-        self.frames = []
         self.current_frame = 0
-        scale_factor = 1.8
-        for i in range(8):
-            frame = self.sprite_sheet.subsurface(pygame.Rect(i * self.frame_width, 0, self.frame_width, self.frame_height))
-            self.frames.append(pygame.transform.scale(frame, (int(GRID_SIZE * scale_factor), int(GRID_SIZE * scale_factor))))
+        scale_factor = TOWER_SCALE_FACTOR
         self.angle = 0
         self.cannon_length = 24 * scale_factor
         self.cannon_offset_x = 0
@@ -311,26 +384,20 @@ class SniperTower(Tower):
 
         self.game = None
 
-        self.explosion_sound = pygame.mixer.Sound("assets/sounds/explosion.wav")
-        self.explosion_sound.set_volume(0.05)
-
-    def draw(self, screen: pygame.Surface, show_range: bool = False):
+    def emit(self, queue: RenderQueue, show_range: bool = False):
         if show_range or self.is_selected:
-            pygame.draw.circle(screen, (255, 255, 255, 100), (int(self.x), int(self.y)), self.range, 1)
+            queue.add_primitive(LAYER_UNDERLAY, pygame.draw.circle, (255, 255, 255, 100), (int(self.x), int(self.y)), self.range, 1)
         if self.is_dragging:
-            s = pygame.Surface((GRID_SIZE, GRID_SIZE), pygame.SRCALPHA)
-            s.fill((128, 128, 128, 128))
-            screen.blit(s, (self.x - GRID_SIZE // 2, self.y - GRID_SIZE // 2))
+            s = overlays.get_rect((GRID_SIZE, GRID_SIZE), (128, 128, 128, 128))
+            queue.add_centered(LAYER_TOWERS, s, self.x, self.y)
         else:
             if self.frames:
                 frame_to_draw = self.current_frame if self.is_animating else 0
                 original_frame = self.frames[frame_to_draw]
-                rotated_frame = pygame.transform.rotate(original_frame, -(self.angle+90))
-                new_rect = rotated_frame.get_rect(center=(self.x, self.y)
-)
-                screen.blit(rotated_frame, new_rect.topleft)
+                rotated_frame = sprite_cache.get_rotated(original_frame, -(self.angle+90))
+                queue.add_centered(LAYER_TOWERS, rotated_frame, self.x, self.y)
         if self.is_selected:
-            pygame.draw.rect(screen, YELLOW,
+            queue.add_primitive(LAYER_TOWERS, pygame.draw.rect, YELLOW,
                             (self.grid_x * GRID_SIZE - 2,
                              self.grid_y * GRID_SIZE - 2,
                              GRID_SIZE + 4, GRID_SIZE + 4), 2)
@@ -344,12 +411,12 @@ class SniperTower(Tower):
             self.angle = math.degrees(math.atan2(dy, dx))
 
     def fire(self, target: 'Enemy') -> Projectile:
-        if self.game and self.game.menu.sound_enabled:
-            self.shoot_sound.play()
+        if self.game and self.game.sound_enabled:
+            sound_bank.play("cannon")
 
 
         self.is_animating = True
-        self.animation_timer = len(self.frames) * 5
+        self.animation_timer = self.frame_count * 5
         self.current_frame = 0
 
         dx = target.x - self.x
@@ -365,10 +432,10 @@ class SniperTower(Tower):
         proj.aoe_radius = 50  # Bán kính nổ
         return proj
 
-    def update_cooldown(self,enemies):
+    def update_cooldown(self):
         if self.cooldown > 0:
             self.cooldown -= 1
-        target = self.find_target(enemies)
+        target = self.target
         if target:
             dx = target.x - self.x
             dy = target.y - self.y
@@ -378,23 +445,26 @@ class SniperTower(Tower):
             if self.animation_timer <= 0:
                 self.is_animating = False
             else:
-                self.current_frame = (len(self.frames) - 1) - (self.animation_timer // 5)
+                self.current_frame = (self.frame_count - 1) - (self.animation_timer // 5)
+
+def beam_hit_counts(origin_x: float, origin_y: float, beam_range: float, beam_angles: np.ndarray,
+                    xs: np.ndarray, ys: np.ndarray, hit_angle: float = LASER_HIT_ANGLE) -> np.ndarray:
+    """Number of beams hitting each point (xs[i], ys[i]): in range and within hit_angle of the beam."""
+    dx = xs - origin_x
+    dy = ys - origin_y
+    in_range = dx * dx + dy * dy <= beam_range * beam_range
+    # Hiệu góc chuẩn hoá về [-pi, pi) để quái ngay bên trái tháp (góc quanh ±pi) vẫn bị trúng
+    diff = np.arctan2(dy, dx)[:, None] - beam_angles[None, :]
+    diff = (diff + math.pi) % (2 * math.pi) - math.pi
+    hits = (np.abs(diff) < hit_angle) & in_range[:, None]
+    return hits.sum(axis=1)
+
 
 class LaserTower(Tower):
     def __init__(self, grid_x: int, grid_y: int):
         super().__init__(grid_x, grid_y, damage=3, range_radius=150, fire_rate=1, cost=120)
 
-        # Load sprite
-        self.sprite_sheet = pygame.image.load("assets/tower/laser_tower.png").convert_alpha()
-        self.frame_width = 128
-        self.frame_height = 128
-
-        # Scale ảnh cho phù hợp GRID_SIZE
-        scale_factor = 0.6
-        self.image = pygame.transform.scale(
-            self.sprite_sheet,
-            (int(self.frame_width * scale_factor), int(self.frame_height * scale_factor))
-        )
+        scale_factor = LASER_SCALE_FACTOR
 
         self.cannon_length = 24 * scale_factor
         self.cannon_offset_x = 0
@@ -402,17 +472,22 @@ class LaserTower(Tower):
 
         self.laser_color = (0, 255, 255)
         self.beam_width = 4
-        self.target = None
         self.tick = 0
         self.laser_flash_timer = 0
-        self.laser_sound = pygame.mixer.Sound("assets/sounds/laserpew.ogg")
-        self.laser_sound.set_volume(0.2)
+        self.beam_angles = np.zeros(0)
+        self.beam_ends: List[Tuple[int, int]] = []
+
+    @property
+    def image(self) -> pygame.Surface:
+        # Ảnh dùng chung, đã scale sẵn; chỉ tải khi vẽ
+        return load_laser_tower_image()
 
-    def update_cooldown(self, enemies):
+    def update_cooldown(self):
         if self.cooldown > 0:
             self.cooldown -= 1
+        if self.laser_flash_timer > 0:
+            self.laser_flash_timer -= 1
 
-        self.target = self.find_target(enemies)
         if self.target:
             dx = self.target.x - self.x
             dy = self.target.y - self.y
@@ -421,7 +496,7 @@ class LaserTower(Tower):
             self.tick += 1
             if self.tick >= 5:
                 self.tick = 0
-                self.laser_flash_timer = 3  # Hiện laser trong 3 frame
+                self.laser_flash_timer = 3  # Hiện laser trong 3 tick
                 self.deal_laser_damage()  # Gây sát thương
         else:
             self.tick = 0
@@ -430,68 +505,62 @@ class LaserTower(Tower):
     def fire(self, target):
         return []  # không tạo đạn
 
-    def draw(self, screen: pygame.Surface, show_range: bool = False):
+    def get_dirty_rect(self, show_range: bool = False) -> pygame.Rect:
+        rect = super().get_dirty_rect(show_range)
+        if self.laser_flash_timer > 0:
+            # Tia laser dài bằng tầm bắn
+            rect = centered_rect(self.x, self.y, self.range + self.beam_width, rect)
+        return rect
+
+    def emit(self, queue: RenderQueue, show_range: bool = False):
         if show_range or self.is_selected:
-            pygame.draw.circle(screen, (255, 255, 255, 100), (int(self.x), int(self.y)), self.range, 1)
+            queue.add_primitive(LAYER_UNDERLAY, pygame.draw.circle, (255, 255, 255, 100), (int(self.x), int(self.y)), self.range, 1)
 
         if self.is_dragging:
-            s = pygame.Surface((GRID_SIZE, GRID_SIZE), pygame.SRCALPHA)
-            s.fill((128, 128, 128, 128))
-            screen.blit(s, (self.x - GRID_SIZE // 2, self.y - GRID_SIZE // 2))
+            s = overlays.get_rect((GRID_SIZE, GRID_SIZE), (128, 128, 128, 128))
+            queue.add_centered(LAYER_TOWERS, s, self.x, self.y)
         else:
-            rect = self.image.get_rect(center=(self.x, self.y))
-            screen.blit(self.image, rect.topleft)
+            queue.add_centered(LAYER_TOWERS, self.image, self.x, self.y)
 
         if self.is_selected:
-            pygame.draw.rect(screen, YELLOW,
+            queue.add_primitive(LAYER_TOWERS, pygame.draw.rect, YELLOW,
                              (self.grid_x * GRID_SIZE - 2, self.grid_y * GRID_SIZE - 2, GRID_SIZE + 4, GRID_SIZE + 4),
                              2)
 
-        # Laser flash effect (hiện trong 3 frame)
+        # Laser flash effect (hiện trong 3 tick), dùng lại các tia đã tính lúc gây sát thương
         if self.laser_flash_timer > 0 and self.target and not self.target.is_dead():
-            self.laser_flash_timer -= 1
-
-            angle = math.atan2(self.target.y - self.y, self.target.x - self.x)
-            num_beams = 1 + (self.level - 1) * 2
-            spread_angle = 10
-
-            for i in range(num_beams):
-                offset = (i - (num_beams - 1) / 2) * math.radians(spread_angle)
-                beam_angle = angle + offset
+            origin = (int(self.x), int(self.y))
+            for end in self.beam_ends:
+                queue.add_primitive(LAYER_TOWERS, pygame.draw.line, self.laser_color, origin, end, self.beam_width)
 
-                # Tính điểm xa nhất
-                end_x = self.x + math.cos(beam_angle) * self.range
-                end_y = self.y + math.sin(beam_angle) * self.range
-
-                pygame.draw.line(
-                    screen,
-                    self.laser_color,
-                    (int(self.x), int(self.y)),
-                    (int(end_x), int(end_y)),
-                    self.beam_width
-                )
-
-    def deal_laser_damage(self):
+    def compute_beams(self):
+        """Beam angles and end points for this laser tick, shared by the damage and draw passes."""
         angle = math.atan2(self.target.y - self.y, self.target.x - self.x)
-
         num_beams = 1 + (self.level - 1) * 2  # Level 1: 1 tia, Level 2: 3 tia, ...
-        spread_angle = 10  # độ lệch mỗi tia
-
-        if self.game and self.game.menu.sound_enabled:
-            self.laser_sound.play()
+        offsets = (np.arange(num_beams) - (num_beams - 1) / 2) * math.radians(LASER_SPREAD_DEGREES)
+        self.beam_angles = angle + offsets
+        # Điểm xa nhất của mỗi tia
+        self.beam_ends = [(int(self.x + math.cos(beam_angle) * self.range), int(self.y + math.sin(beam_angle) * self.range))
+                          for beam_angle in self.beam_angles]
 
-        for i in range(num_beams):
-            offset = (i - (num_beams - 1) / 2) * math.radians(spread_angle)
-            beam_angle = angle + offset
-
-            for enemy in self.game.enemies:
-                dx = enemy.x - self.x
-                dy = enemy.y - self.y
-                dist = math.hypot(dx, dy)
-                if dist <= self.range:
-                    angle_to_enemy = math.atan2(dy, dx)
-                    if abs(angle_to_enemy - beam_angle) < 0.15:
-                        enemy.take_damage(self.damage)
+    def deal_laser_damage(self):
+        self.compute_beams()
+
+        if self.game and self.game.sound_enabled:
+            sound_bank.play("laser")
+
+        if not self.game:
+            return
+        # Chỉ xét quái trong tầm bắn, lấy từ lưới không gian
+        enemies = self.game.enemy_grid.query_circle(self.x, self.y, self.range)
+        if not enemies:
+            return
+        xs = np.fromiter((enemy.x for enemy in enemies), dtype=np.float64, count=len(enemies))
+        ys = np.fromiter((enemy.y for enemy in enemies), dtype=np.float64, count=len(enemies))
+        hits = beam_hit_counts(self.x, self.y, self.range, self.beam_angles, xs, ys)
+        # Mỗi tia trúng gây sát thương riêng
+        for index in np.flatnonzero(hits):
+            enemies[index].take_damage(self.damage * int(hits[index]))
 
     def upgrade(self):
         self.level += 1
@@ -501,20 +570,15 @@ class LaserTower(Tower):
 
 
 class SlowTower(Tower):
+    sprite_type = "slow_tower"
+
     def __init__(self, grid_x: int, grid_y: int):
         super().__init__(grid_x, grid_y, damage=10, range_radius=140, fire_rate=40, cost=90)
 
         self.slow_amount = 0.5      # Giảm 50% tốc độ
         self.slow_duration = 90     # Trong 90 frame (1.5s)
 
-        self.sprite_sheet = pygame.image.load("assets/tower/slow_tower.png").convert_alpha()
-        self.frame_width = 128
-        self.frame_height = 128
-        self.frames = []
-        scale_factor = 1.8
-        for i in range(11):  # 11 frame animation
-            frame = self.sprite_sheet.subsurface(pygame.Rect(i * self.frame_width, 0, self.frame_width, self.frame_height))
-            self.frames.append(pygame.transform.scale(frame, (int(GRID_SIZE * scale_factor), int(GRID_SIZE * scale_factor))))
+        scale_factor = TOWER_SCALE_FACTOR
 
         self.current_frame = 0
         self.animation_timer = 0
@@ -526,12 +590,12 @@ class SlowTower(Tower):
         self.cannon_offset_x = 0
         self.cannon_offset_y = -int(GRID_SIZE * scale_factor * 0.5) + 64
 
-    def update_cooldown(self, enemies):
+    def update_cooldown(self):
         if self.cooldown > 0:
             self.cooldown -= 1
 
         # Xoay theo target
-        target = self.find_target(enemies)
+        target = self.target
         if target:
             dx = target.x - self.x
             dy = target.y - self.y
@@ -543,13 +607,13 @@ class SlowTower(Tower):
             if self.animation_timer <= 0:
                 self.is_animating = False
             else:
-                self.current_frame = (len(self.frames) - 1) - (self.animation_timer // 5)
+                self.current_frame = (self.frame_count - 1) - (self.animation_timer // 5)
 
     def fire(self, target: 'Enemy'):
-        if self.game and self.game.menu.sound_enabled:
-            self.shoot_sound.play()
+        if self.game and self.game.sound_enabled:
+            sound_bank.play("cannon")
         self.is_animating = True
-        self.animation_timer = len(self.frames) * 5
+        self.animation_timer = self.frame_count * 5
         self.current_frame = 0
 
         # Tính hướng bắn
@@ -573,24 +637,22 @@ class SlowTower(Tower):
         )
         return proj
 
-    def draw(self, screen: pygame.Surface, show_range: bool = False):
+    def emit(self, queue: RenderQueue, show_range: bool = False):
         if show_range or self.is_selected:
-            pygame.draw.circle(screen, (100, 200, 255, 80), (int(self.x), int(self.y)), self.range, 1)
+            queue.add_primitive(LAYER_UNDERLAY, pygame.draw.circle, (100, 200, 255, 80), (int(self.x), int(self.y)), self.range, 1)
 
         if self.is_dragging:
-            s = pygame.Surface((GRID_SIZE, GRID_SIZE), pygame.SRCALPHA)
-            s.fill((128, 128, 255, 128))
-            screen.blit(s, (self.x - GRID_SIZE // 2, self.y - GRID_SIZE // 2))
+            s = overlays.get_rect((GRID_SIZE, GRID_SIZE), (128, 128, 255, 128))
+            queue.add_centered(LAYER_TOWERS, s, self.x, self.y)
         else:
             if self.frames:
                 frame_to_draw = self.current_frame if self.is_animating else 0
                 original_frame = self.frames[frame_to_draw]
-                rotated_frame = pygame.transform.rotate(original_frame, -(self.angle + 90))
-                rect = rotated_frame.get_rect(center=(self.x, self.y))
-                screen.blit(rotated_frame, rect.topleft)
+                rotated_frame = sprite_cache.get_rotated(original_frame, -(self.angle + 90))
+                queue.add_centered(LAYER_TOWERS, rotated_frame, self.x, self.y)
 
         if self.is_selected:
-            pygame.draw.rect(screen, BLUE, (
+            queue.add_primitive(LAYER_TOWERS, pygame.draw.rect, BLUE, (
                 self.grid_x * GRID_SIZE - 2,
                 self.grid_y * GRID_SIZE - 2,
                 GRID_SIZE + 4, GRID_SIZE + 4
@@ -1,18 +1,18 @@
 import pygame
 from typing import Tuple, Optional
 from constants import *
+import sound_bank
+from preloader import draw_progress_bar
 
 class WelcomeScreen:
-    def __init__(self, screen):
+    def __init__(self, screen, preloader=None):
         self.screen = screen
+        self.preloader = preloader
         self.button_height = int(SCREEN_HEIGHT * 0.08)  # Dynamic button height
         self.button_width = int(SCREEN_WIDTH * 0.3)  # Dynamic button width
         self.button_margin = int(SCREEN_HEIGHT * 0.02)  # Dynamic margin
         self.buttons = {}
         self.create_buttons()
-
-        self.click_sound = pygame.mixer.Sound("assets/sounds/Menu Selection Click.wav")
-        self.click_sound.set_volume(0.3)
         
     def create_buttons(self):
         # Title position
@@ -55,6 +55,10 @@ class WelcomeScreen:
         
         # Draw quit button
         self.draw_button("Quit Game", "quit", True, False)
+
+        # Draw asset loading progress
+        if self.preloader and not self.preloader.finished:
+            draw_progress_bar(self.screen, self.preloader.progress)
     
     def draw_button(self, text, button_id, enabled, is_selected):
         button = self.buttons[button_id]
@@ -69,6 +73,6 @@ class WelcomeScreen:
     def handle_click(self, pos) -> Optional[str]:
         for button_id, button in self.buttons.items():
             if button.collidepoint(pos):
-                self.click_sound.play()
+                sound_bank.play("click")
                 return button_id
         return None 